@@ -0,0 +1,26 @@
+"""Authentication backend that caches the session user between requests.
+
+Enabled by ``CV_USER_CACHE_TTL``. The cached user carries the password hash
+that Django checks against the session on every request, so the entry is
+dropped whenever the user is saved or deleted (see ``accounts.signals``):
+a password change signs out other sessions at once in the process that made
+it, and in other processes once their entry expires.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.CV_USER_CACHE_TTL)
+        return user
@@ -1,9 +1,11 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 
 from .forms import SignUpForm
 from cv_app.models import CV
+from cv_builder.decorators import alogin_required
 
 
 def signup(request):
@@ -26,3 +28,13 @@ def profile(request):
         'cv_count': cv_count
     }
     return render(request, 'accounts/profile.html', context)
+
+
+@alogin_required
+async def aprofile(request):
+    cv_count = await CV.objects.filter(owner=request.user).acount()
+    context = {
+        'user': request.user,
+        'cv_count': cv_count
+    }
+    return await sync_to_async(render)(request, 'accounts/profile.html', context)
@@ -1,15 +1,185 @@
-from django.contrib import admin
-from .models import CVTemplate, CV
+from functools import partial
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from .models import CVTemplate, CV, RequestTimingSummary, SECTION_FIELDS
+from .registry import template_registry
+from .search import search_q
+from .sections import clean_items
+from .sharing import write_snapshot
+from .transfer import export_lines
+
+SNAPSHOT_BATCH_SIZE = 500
+
+
+class TemplateTargetForm(forms.Form):
+    template = forms.ModelChoiceField(queryset=CVTemplate.objects.none(), empty_label=None,
+                                      label='Move CVs to')
+
+    def __init__(self, *args, exclude=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['template'].queryset = CVTemplate.objects.filter(active=True).exclude(pk__in=exclude)
+
+
+class CVAdminForm(forms.ModelForm):
+    """CV change form with the section lists, which live on CVContent, edited as JSON."""
+    experience = forms.JSONField(required=False, widget=forms.Textarea(attrs={'rows': 10}))
+    education = forms.JSONField(required=False, widget=forms.Textarea(attrs={'rows': 6}))
+    projects = forms.JSONField(required=False, widget=forms.Textarea(attrs={'rows': 6}))
+
+    class Meta:
+        model = CV
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in SECTION_FIELDS:
+            self.initial.setdefault(field, getattr(self.instance, field))
+
+    def _clean_section(self, field):
+        # The same per-item validation as the editor and import_cvs
+        return clean_items(field, self.cleaned_data.get(field) or [])
+
+    def clean_experience(self):
+        return self._clean_section('experience')
+
+    def clean_education(self):
+        return self._clean_section('education')
+
+    def clean_projects(self):
+        return self._clean_section('projects')
+
+    def save(self, commit=True):
+        # Assigned through the CV properties, so save() moves it to the matching content row
+        for field in SECTION_FIELDS:
+            if field in self.changed_data:
+                setattr(self.instance, field, self.cleaned_data[field])
+        return super().save(commit=commit)
+
+
+def _choose_template(modeladmin, request, action, title, summary, exclude=()):
+    """The template picked on the intermediate page, or ``(None, response)`` to show it."""
+    form = TemplateTargetForm(request.POST if 'apply' in request.POST else None, exclude=exclude)
+    if form.is_valid():
+        return form.cleaned_data['template'], None
+    return None, TemplateResponse(request, 'admin/cv_app/choose_template.html', {
+        **modeladmin.admin_site.each_context(request),
+        'title': title,
+        'summary': summary,
+        'opts': modeladmin.model._meta,
+        'form': form,
+        'action': action,
+        'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+        'select_across': request.POST.get('select_across', '0'),
+    })
+
+
+def _rewrite_snapshots(cv_ids):
+    for start in range(0, len(cv_ids), SNAPSHOT_BATCH_SIZE):
+        batch = CV.objects.filter(pk__in=cv_ids[start:start + SNAPSHOT_BATCH_SIZE]).select_related('content')
+        for cv in batch:
+            write_snapshot(cv)
+
+
+def _move_cvs(cvs, target):
+    """Point ``cvs`` at ``target`` in one UPDATE and return the number of rows changed.
+
+    Bypasses save(), so no revisions are recorded. updated_at is bumped in
+    the same statement because the dashboard and preview ETags, cached
+    bodies and PDF names are all keyed by it. Published snapshots are
+    re-rendered once the transaction commits.
+    """
+    cvs = cvs.exclude(template=target)
+    published = list(cvs.exclude(share_token=None).values_list('pk', flat=True))
+    moved = cvs.order_by().update(template=target, updated_at=timezone.now())
+    if published:
+        transaction.on_commit(partial(_rewrite_snapshots, published))
+    return moved
 
 
 @admin.register(CVTemplate)
 class CVTemplateAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug', 'active']
     prepopulated_fields = {'slug': ('name',)}
+    actions = ['deactivate_and_migrate']
+
+    @admin.action(description='Deactivate selected templates and move their CVs', permissions=['change'])
+    def deactivate_and_migrate(self, request, queryset):
+        retired = list(queryset.values_list('pk', flat=True))
+        target, response = _choose_template(
+            self, request, 'deactivate_and_migrate', 'Deactivate templates',
+            f'{len(retired)} template(s) will be hidden from the picker and their CVs moved.', exclude=retired)
+        if target is None:
+            return response
+        with transaction.atomic():
+            moved = _move_cvs(CV.objects.filter(template_id__in=retired), target)
+            deactivated = CVTemplate.objects.filter(pk__in=retired, active=True).update(active=False)
+        # update() sends no signals
+        template_registry.invalidate()
+        self.message_user(request, f'Deactivated {deactivated} template(s) and moved {moved} CV(s) to {target.name}.',
+                          messages.SUCCESS)
 
 
 @admin.register(CV)
 class CVAdmin(admin.ModelAdmin):
+    form = CVAdminForm
     list_display = ['title', 'owner', 'template', 'updated_at']
     list_filter = ['template', 'created_at']
+    list_select_related = ['owner', 'template']
     search_fields = ['title', 'owner__username']
+    # Newest first by primary key: ordering by updated_at would sort the whole table
+    ordering = ['-pk']
+    # Filtered pages skip the second COUNT(*) over the whole table
+    show_full_result_count = False
+    actions = ['reassign_template', 'export_selected']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Served by the full-text index instead of icontains scans
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(search_q(search_term) | Q(owner__username=search_term.strip())), False
+
+    @admin.action(description='Switch selected CVs to another template', permissions=['change'])
+    def reassign_template(self, request, queryset):
+        if request.POST.get('select_across') == '1':
+            summary = 'Every CV matching the current filters will be moved.'
+        else:
+            summary = f'{len(request.POST.getlist(ACTION_CHECKBOX_NAME))} selected CV(s) will be moved.'
+        target, response = _choose_template(self, request, 'reassign_template', 'Switch template', summary)
+        if target is None:
+            return response
+        with transaction.atomic():
+            moved = _move_cvs(queryset, target)
+        self.message_user(request, f'Moved {moved} CV(s) to {target.name}.', messages.SUCCESS)
+
+    @admin.action(description='Export selected CVs as JSON Lines', permissions=['view'])
+    def export_selected(self, request, queryset):
+        # export_lines picks its own columns and joins
+        response = StreamingHttpResponse(
+            export_lines(queryset.select_related(None)),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'attachment; filename="cvs.jsonl"'
+        return response
+
+
+@admin.register(RequestTimingSummary)
+class RequestTimingSummaryAdmin(admin.ModelAdmin):
+    list_display = ['url_name', 'period_end', 'pid', 'count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+                    'mean_queries', 'mean_db_ms', 'mean_template_ms', 'mean_pool_wait_ms']
+    list_filter = ['url_name']
+    date_hierarchy = 'period_end'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
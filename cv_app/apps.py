@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CvAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cv_app'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+
+        from . import signals
+
+        post_migrate.connect(signals.ensure_search_index, sender=self)
@@ -0,0 +1,147 @@
+"""Per-template CSS bundles and responsive WebP template previews.
+
+``manage.py build_assets`` writes them under ``CV_ASSET_BUILD_DIR``, which is
+a static files source, so ``collectstatic`` fingerprints them and WhiteNoise
+serves gzip and Brotli variants. ``assets.json`` in the same directory tells
+the ``cv_assets`` template tags what was built. Without a build the tags fall
+back to the source files.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from PIL import Image
+
+from .rendering import PREVIEW_TEMPLATE_SLUGS
+
+MANIFEST_NAME = 'assets.json'
+BASE_CSS = 'css/global.css'
+PREVIEW_IMAGE_DIR = 'img/template_previews'
+PREVIEW_WIDTHS = (256, 512)
+WEBP_QUALITY = 80
+
+_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+
+
+def template_css_path(slug):
+    return f'css/templates/{slug}.css'
+
+
+def bundle_path(slug):
+    return f'css/bundles/{slug}.css'
+
+
+def _minify_code(code):
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r'\s*([{};,>])\s*', r'\1', code)
+    code = re.sub(r':\s+', ':', code)
+    return code.replace(';}', '}')
+
+
+def minify_css(text):
+    """Drop comments and insignificant whitespace, leaving string literals alone."""
+    text = _COMMENT.sub('', text)
+    parts = _STRING.split(text)
+    # split() with one capturing group alternates code and strings
+    return ''.join(part if i % 2 else _minify_code(part) for i, part in enumerate(parts)).strip()
+
+
+def _read_static(path):
+    found = finders.find(path)
+    if found is None:
+        raise FileNotFoundError(f'static file {path!r} not found')
+    return Path(found).read_text(encoding='utf-8')
+
+
+def _write(out_dir, path, data):
+    target = out_dir / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(data, encoding='utf-8')
+
+
+def build_css(out_dir, slugs=PREVIEW_TEMPLATE_SLUGS):
+    """Write one minified global + template stylesheet per slug."""
+    base = _read_static(BASE_CSS)
+    built = {}
+    for slug in slugs:
+        bundle = minify_css(base + '\n' + _read_static(template_css_path(slug)))
+        _write(out_dir, bundle_path(slug), bundle)
+        built[slug] = {'path': bundle_path(slug), 'bytes': len(bundle.encode())}
+    return built
+
+
+def preview_sources():
+    """Static paths of the PNG/JPEG template previews, from every static files source."""
+    sources = set()
+    for finder in finders.get_finders():
+        for path, _ in finder.list([]):
+            path = path.replace('\\', '/')
+            if path.startswith(PREVIEW_IMAGE_DIR + '/') and path.lower().endswith(('.png', '.jpg', '.jpeg')):
+                sources.add(path)
+    return sorted(sources)
+
+
+def build_previews(out_dir, sources, widths=PREVIEW_WIDTHS):
+    """Write WebP copies of each preview image at ``widths`` no wider than the original."""
+    built = {}
+    for source in sources:
+        found = finders.find(source)
+        if found is None:
+            continue
+        stem = source.rsplit('.', 1)[0]
+        variants = []
+        with Image.open(found) as image:
+            image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            for width in sorted(set(min(w, image.width) for w in widths)):
+                height = round(image.height * width / image.width)
+                resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                path = f'{stem}-{width}.webp'
+                target = out_dir / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                resized.save(target, 'WEBP', quality=WEBP_QUALITY, method=6)
+                variants.append({'path': path, 'width': width, 'height': height})
+            built[source] = {'width': image.width, 'height': image.height, 'webp': variants}
+    return built
+
+
+def write_manifest(out_dir, manifest):
+    _write(out_dir, MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    load_manifest.cache_clear()
+    inline_css.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def load_manifest():
+    """The last build's manifest, or an empty one when ``build_assets`` has not run."""
+    try:
+        with open(Path(settings.CV_ASSET_BUILD_DIR) / MANIFEST_NAME, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def bundle_css(slug):
+    """The minified global + template stylesheet for ``slug``, built now if ``build_assets`` has not run."""
+    entry = load_manifest().get('css', {}).get(slug)
+    if entry is not None:
+        try:
+            return (Path(settings.CV_ASSET_BUILD_DIR) / entry['path']).read_text(encoding='utf-8')
+        except OSError:
+            pass
+    return minify_css(_read_static(BASE_CSS) + '\n' + _read_static(template_css_path(slug)))
+
+
+@lru_cache(maxsize=None)
+def inline_css(slug):
+    """The built bundle for ``slug`` when it is small enough to inline, else None."""
+    entry = load_manifest().get('css', {}).get(slug)
+    if entry is None or entry['bytes'] > settings.CV_INLINE_CSS_MAX_BYTES:
+        return None
+    try:
+        return (Path(settings.CV_ASSET_BUILD_DIR) / entry['path']).read_text(encoding='utf-8')
+    except OSError:
+        return None
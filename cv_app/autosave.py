@@ -0,0 +1,117 @@
+"""Incremental CV updates sent by the editor's autosave.
+
+A patch is a JSON object::
+
+    {
+        "version": "<updated_at the client last saw, ISO 8601>",
+        "fields": {"summary": "...", "template": 3},
+        "sections": {
+            "experience": [
+                {"op": "replace", "index": 0, "item": {...}},
+                {"op": "insert", "index": 2, "item": {...}},
+                {"op": "remove", "index": 3}
+            ]
+        }
+    }
+
+Fields are validated with the editor's form fields and items with its item
+forms. Section operations apply in order, so indexes refer to the list as
+left by the previous operation.
+"""
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+from .forms import CVForm
+from .sections import SECTIONS, clean_item
+
+PATCH_FIELDS = ('title', 'template', 'full_name', 'job_title', 'email', 'phone', 'location', 'links', 'summary', 'skills')
+
+
+def cv_version(cv):
+    """Opaque token the editor echoes back so stale patches can be refused."""
+    return cv.updated_at.isoformat() if cv.updated_at else ''
+
+
+def editor_config(cv):
+    """What the edit page's autosave script needs to build patches for ``cv``."""
+    return {
+        'url': reverse('cv_autosave', args=[cv.pk]),
+        'version': cv_version(cv),
+        'fields': PATCH_FIELDS,
+        'sections': {
+            field: {'prefix': prefix, 'keys': list(formset_class.form.base_fields)}
+            for field, (formset_class, prefix, _, _, _) in SECTIONS.items()
+        },
+    }
+
+
+def _apply_item_op(field, items, op):
+    if not isinstance(op, dict):
+        raise ValidationError(f'{field}: operations must be objects')
+    kind, index = op.get('op'), op.get('index')
+    if not isinstance(index, int) or isinstance(index, bool):
+        raise ValidationError(f'{field}: index must be an integer')
+    limit = len(items) if kind == 'insert' else len(items) - 1
+    if not 0 <= index <= limit:
+        raise ValidationError(f'{field}[{index}]: index out of range')
+    if kind == 'remove':
+        del items[index]
+        return
+    if kind not in ('replace', 'insert'):
+        raise ValidationError(f'{field}: unknown operation {kind!r}')
+    try:
+        item = clean_item(field, op.get('item'))
+    except ValidationError as exc:
+        raise ValidationError(f'{field}[{index}]: {"; ".join(exc.messages)}')
+    if item is None:
+        raise ValidationError(f'{field}[{index}]: item is blank')
+    if kind == 'replace':
+        items[index] = item
+    else:
+        items.insert(index, item)
+
+
+def apply_patch(cv, patch):
+    """Apply ``patch`` to ``cv`` in memory and return the names of the fields it changed.
+
+    Raises ValidationError listing every invalid field or operation; ``cv``
+    must then be discarded, as valid parts may already have been applied.
+    """
+    if not isinstance(patch, dict):
+        raise ValidationError('patch must be a JSON object')
+    fields = patch.get('fields') or {}
+    sections = patch.get('sections') or {}
+    if not isinstance(fields, dict) or not isinstance(sections, dict):
+        raise ValidationError('fields and sections must be objects')
+
+    changed = []
+    errors = []
+    for name, value in fields.items():
+        if name not in PATCH_FIELDS:
+            errors.append(f'{name}: not an editable field')
+            continue
+        try:
+            cleaned = CVForm.base_fields[name].clean(value)
+        except ValidationError as exc:
+            errors.append(f'{name}: {" ".join(exc.messages)}')
+            continue
+        setattr(cv, name, cleaned)
+        changed.append(name)
+
+    for field, ops in sections.items():
+        if field not in SECTIONS or not isinstance(ops, list):
+            errors.append(f'{field}: not a section or not a list of operations')
+            continue
+        items = list(getattr(cv, field) or [])
+        try:
+            for op in ops:
+                _apply_item_op(field, items, op)
+        except ValidationError as exc:
+            errors.extend(exc.messages)
+            continue
+        setattr(cv, field, items)
+        changed.append(field)
+
+    if errors:
+        raise ValidationError(errors)
+    return changed
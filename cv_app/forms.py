@@ -1,7 +1,38 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import CV, CVTemplate
-import json
+from django.core.files.uploadedfile import UploadedFile
+from django.forms.models import ModelChoiceIterator
+from .images import process_photo
+from .models import CV
+from .registry import template_registry
+
+
+class TemplateChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for tmpl in template_registry.active():
+            yield self.choice(tmpl)
+
+    def __len__(self):
+        return len(template_registry.active()) + (1 if self.field.empty_label is not None else 0)
+
+
+class TemplateChoiceField(forms.ModelChoiceField):
+    """Template picker backed by the in-process registry instead of a queryset."""
+    iterator = TemplateChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        tmpl = template_registry.get_by_id(value, active_only=True)
+        if tmpl is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return tmpl
 
 
 class CVForm(forms.ModelForm):
@@ -10,8 +41,9 @@ class CVForm(forms.ModelForm):
         fields = [
             'title', 'template', 'full_name', 'job_title',
             'email', 'phone', 'location', 'links', 'photo',
-            'summary', 'skills', 'experience', 'education', 'projects'
+            'summary', 'skills',
         ]
+        field_classes = {'template': TemplateChoiceField}
         widgets = {
             'title': forms.TextInput(attrs={'placeholder': 'e.g., Software Engineer CV'}),
             'full_name': forms.TextInput(attrs={'placeholder': 'John Doe'}),
@@ -32,19 +64,15 @@ class CVForm(forms.ModelForm):
                 'rows': 3,
                 'placeholder': 'Python, Django, JavaScript, React, SQL'
             }),
-            # Hidden in UI; we will populate these from structured formsets in the view
-            'experience': forms.Textarea(attrs={'rows': 1, 'style': 'display:none;'}),
-            'education': forms.Textarea(attrs={'rows': 1, 'style': 'display:none;'}),
-            'projects': forms.Textarea(attrs={'rows': 1, 'style': 'display:none;'}),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['template'].queryset = CVTemplate.objects.filter(active=True)
-        # Ensure these are optional since we populate them programmatically
-        self.fields['experience'].required = False
-        self.fields['education'].required = False
-        self.fields['projects'].required = False
+    def save(self, commit=True):
+        photo = self.cleaned_data.get('photo')
+        if isinstance(photo, UploadedFile):
+            # Store the normalized variants instead of the raw upload
+            field = self.instance.photo
+            self.instance.photo = process_photo(photo, field.storage)
+        return super().save(commit=commit)
 
 
 class ExperienceItemForm(forms.Form):
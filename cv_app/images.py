@@ -0,0 +1,72 @@
+import hashlib
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .storage import DIGEST_LENGTH
+
+PHOTO_DIR = 'photos'
+# The -main suffix marks files written by process_photo; ContentAddressedStorage.save
+# names plain uploads <digest>.<ext>, so they never look processed
+_PROCESSED_NAME = re.compile(rf'^{PHOTO_DIR}/(?P<digest>[0-9a-f]{{{DIGEST_LENGTH}}})-main\.jpg$')
+
+
+def _encode(img, fmt, **options):
+    buf = BytesIO()
+    img.save(buf, fmt, **options)
+    return buf.getvalue()
+
+
+def _flatten(img):
+    # Composite transparent images onto white; JPEG has no alpha channel.
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        rgba = img.convert('RGBA')
+        background = Image.new('RGB', rgba.size, 'white')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return img.convert('RGB')
+
+
+def variant_names(name):
+    """Map a processed photo name to its variant names, or return None for legacy uploads."""
+    match = _PROCESSED_NAME.match(name or '')
+    if not match:
+        return None
+    base = f"{PHOTO_DIR}/{match['digest']}"
+    return {
+        'jpeg': f'{base}-main.jpg',
+        'webp': f'{base}-main.webp',
+        'thumb_jpeg': f'{base}-thumb.jpg',
+        'thumb_webp': f'{base}-thumb.webp',
+    }
+
+
+def process_photo(uploaded, storage):
+    """Normalize an uploaded photo and store its variants; return the main file name.
+
+    The image is rotated according to its EXIF orientation, re-encoded
+    without metadata, downsized to ``CV_PHOTO_MAX_SIZE`` and saved as JPEG
+    and WebP, plus ``CV_PHOTO_THUMB_SIZE`` thumbnails. Names derive from the
+    content hash, so identical photos map to the same files.
+    """
+    uploaded.seek(0)
+    with Image.open(uploaded) as original:
+        img = _flatten(ImageOps.exif_transpose(original))
+    img.thumbnail((settings.CV_PHOTO_MAX_SIZE, settings.CV_PHOTO_MAX_SIZE), Image.LANCZOS)
+    thumb = img.copy()
+    thumb.thumbnail((settings.CV_PHOTO_THUMB_SIZE, settings.CV_PHOTO_THUMB_SIZE), Image.LANCZOS)
+
+    main = _encode(img, 'JPEG', quality=85, optimize=True, progressive=True)
+    names = variant_names(f'{PHOTO_DIR}/{hashlib.sha256(main).hexdigest()[:DIGEST_LENGTH]}-main.jpg')
+    payloads = {
+        names['jpeg']: main,
+        names['webp']: _encode(img, 'WEBP', quality=80, method=6),
+        names['thumb_jpeg']: _encode(thumb, 'JPEG', quality=85, optimize=True),
+        names['thumb_webp']: _encode(thumb, 'WEBP', quality=80, method=6),
+    }
+    for name, data in payloads.items():
+        storage.save_addressed(name, ContentFile(data))
+    return names['jpeg']
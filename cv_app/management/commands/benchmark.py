@@ -0,0 +1,229 @@
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from io import StringIO
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from cv_app.models import CV, CVContent
+from cv_app.registry import template_registry
+from cv_app.sections import EDUCATION_KEYS, PROJECT_KEYS
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _QueryTimer:
+    """``execute_wrapper`` that counts queries and sums their wall time.
+
+    The debug cursor log rounds each query to whole milliseconds, which makes
+    SQLite queries read as 0.0.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _sections(entries):
+    experience = [{
+        'company': f'Company {i}',
+        'position': f'Senior Engineer {i}',
+        'duration': '2019–2023',
+        'website': f'https://company{i}.example.com',
+        'responsibilities': [f'Responsibility {i}.{j} with some descriptive text' for j in range(5)],
+        'description': 'Led a team delivering features across the stack. ' * 3,
+    } for i in range(entries)]
+    education = [{k: f'{k.title()} {i}' for k in EDUCATION_KEYS} for i in range(entries)]
+    projects = [{k: f'{k.title()} {i} ' * 4 for k in PROJECT_KEYS} for i in range(entries)]
+    return experience, education, projects
+
+
+def _form_data(cv, template):
+    data = {
+        'title': cv.title, 'template': template.pk, 'full_name': cv.full_name, 'email': cv.email,
+        'job_title': cv.job_title, 'summary': cv.summary, 'skills': cv.skills, 'links': cv.links,
+    }
+    sections = (
+        ('exp', cv.get_experience_list(), ('company', 'position', 'duration', 'website', 'description')),
+        ('edu', cv.get_education_list(), EDUCATION_KEYS),
+        ('proj', cv.get_projects_list(), PROJECT_KEYS),
+    )
+    for prefix, items, keys in sections:
+        data[f'{prefix}-TOTAL_FORMS'] = str(len(items))
+        data[f'{prefix}-INITIAL_FORMS'] = '0'
+        for i, item in enumerate(items):
+            for key in keys:
+                data[f'{prefix}-{i}-{key}'] = item.get(key, '')
+            if prefix == 'exp':
+                data[f'{prefix}-{i}-responsibilities'] = '\n'.join(item['responsibilities'])
+    return data
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the dashboard, editor and preview request paths and print JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5, help='Synthetic users to create')
+        parser.add_argument('--cvs', type=int, default=20, help='CVs per user')
+        parser.add_argument('--entries', type=int, default=10, help='Items per CV section')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per scenario')
+        parser.add_argument('--output', help='Write results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        # Seed data and every write made by the scenarios are rolled back at the end.
+        # The run gets a private cache, so clearing it for the cold previews and
+        # the sessions and bodies it stores never touch a shared backend.
+        try:
+            with transaction.atomic(), override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+                CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                    'LOCATION': f'cv-benchmark-{os.getpid()}'}},
+            ):
+                try:
+                    results = self._run(options)
+                finally:
+                    cache.clear()
+                raise _Rollback
+        except _Rollback:
+            pass
+        template_registry.invalidate()
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'params': {k: options[k] for k in ('users', 'cvs', 'entries', 'iterations')},
+            },
+            'results': results,
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
+
+    def _seed(self, options):
+        call_command('populate_templates', stdout=StringIO())
+        templates = template_registry.active()
+        experience, education, projects = _sections(options['entries'])
+        users = []
+        for u in range(options['users']):
+            user = User.objects.create_user(f'bench-{u}-{time.monotonic_ns()}', password='bench')
+            cvs = [
+                CV(
+                    owner=user, title=f'Benchmark CV {i}', template=templates[i % len(templates)],
+                    full_name='Jane Benchmark', job_title='Engineer', email='jane@example.com',
+                    links='https://github.com/jane\nhttps://linkedin.com/in/jane',
+                    summary='Experienced engineer. ' * 20, skills='Python, Django, SQL, ' * 10,
+                    experience=experience, education=education, projects=projects,
+                )
+                for i in range(options['cvs'])
+            ]
+            CVContent.attach(cvs)
+            CV.objects.bulk_create(cvs)
+            users.append(user)
+        return users
+
+    def _measure(self, name, make_request, iterations, before=None, expect=200):
+        def request():
+            response = make_request()
+            # An invalid POST re-renders the form with a 200 and would be timed as a save
+            if response.status_code != expect:
+                raise CommandError(f'{name} returned {response.status_code}, expected {expect}')
+            return response
+
+        timings = []
+        for _ in range(iterations):
+            if before:
+                before()
+            start = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        if before:
+            before()
+        timer = _QueryTimer()
+        with connection.execute_wrapper(timer):
+            request()
+
+        if before:
+            before()
+        tracemalloc.start()
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'iterations': iterations,
+            'latency_ms': {
+                'mean': round(statistics.fmean(timings), 3),
+                'p50': round(_percentile(timings, 50), 3),
+                'p95': round(_percentile(timings, 95), 3),
+                'max': round(max(timings), 3),
+            },
+            'queries': timer.count,
+            'query_time_ms': round(timer.seconds * 1000, 3),
+            'alloc_peak_kb': round(peak / 1024, 1),
+        }
+
+    def _run(self, options):
+        users = self._seed(options)
+        user = users[0]
+        client = Client()
+        client.force_login(user)
+        cv = CV.objects.filter(owner=user).order_by('pk').first()
+        template = template_registry.get_by_id(cv.template_id)
+        data = _form_data(cv, template)
+        n = options['iterations']
+
+        self.stderr.write(f"Seeded {len(users)} users x {options['cvs']} CVs; running {n} iterations each")
+        results = {
+            'dashboard': self._measure('dashboard', lambda: client.get(reverse('dashboard')), n),
+            'cv_create_post': self._measure(
+                'cv_create_post', lambda: client.post(reverse('cv_create'), data), n, expect=302),
+            'cv_edit_get': self._measure(
+                'cv_edit_get', lambda: client.get(reverse('cv_edit', args=[cv.pk])), n),
+            'cv_edit_post': self._measure(
+                'cv_edit_post', lambda: client.post(reverse('cv_edit', args=[cv.pk]), data), n, expect=302),
+        }
+        preview_url = reverse('cv_preview', args=[cv.pk])
+        for tmpl in template_registry.active():
+            results[f'cv_preview:{tmpl.slug}'] = self._measure(
+                f'cv_preview:{tmpl.slug}', lambda slug=tmpl.slug: client.get(preview_url, {'template': slug}), n)
+            results[f'cv_preview:{tmpl.slug}:cold'] = self._measure(
+                f'cv_preview:{tmpl.slug}:cold',
+                lambda slug=tmpl.slug: client.get(preview_url, {'template': slug}), n, before=cache.clear)
+        return results
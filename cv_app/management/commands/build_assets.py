@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cv_app.assets import build_css, build_previews, preview_sources, write_manifest
+
+
+class Command(BaseCommand):
+    help = 'Bundle and minify per-template CSS and build WebP template previews; run before collectstatic'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Build directory (default: CV_ASSET_BUILD_DIR)')
+
+    def handle(self, *args, **options):
+        out_dir = Path(options['output'] or settings.CV_ASSET_BUILD_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+        css = build_css(out_dir)
+        for slug, entry in css.items():
+            self.stdout.write(f"{entry['path']}: {entry['bytes']} bytes")
+
+        images = build_previews(out_dir, preview_sources())
+        for source, entry in images.items():
+            widths = ', '.join(str(v['width']) for v in entry['webp'])
+            self.stdout.write(f'{source}: webp at {widths}px')
+
+        write_manifest(out_dir, {'css': css, 'images': images})
+        self.stdout.write(self.style.SUCCESS(f'Built assets in {out_dir}; run collectstatic to publish them'))
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from cv_app.models import CVRevision
+from cv_app.revisions import compact_history
+
+
+def _kept_numbers(rows, keep_last, daily_before, drop_before):
+    """Numbers to keep from ``rows`` of (number, created_at), oldest first."""
+    kept = {number for number, _ in rows[-keep_last:]} if keep_last else set()
+    last_of_day = {}
+    for number, created_at in rows:
+        if created_at >= daily_before:
+            kept.add(number)
+        elif created_at >= drop_before:
+            last_of_day[created_at.date()] = number
+    kept.update(last_of_day.values())
+    return kept
+
+
+class Command(BaseCommand):
+    help = 'Thin out and expire CV revision history, re-chaining the deltas that remain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+        parser.add_argument('--keep-last', type=int, default=10,
+                            help='Always keep this many newest revisions per CV')
+        parser.add_argument('--daily-after', type=int, default=7,
+                            help='Past this many days keep only the last revision of each day')
+        parser.add_argument('--keep-days', type=int, default=365,
+                            help='Delete revisions older than this many days')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        daily_before = now - timedelta(days=options['daily_after'])
+        drop_before = now - timedelta(days=options['keep_days'])
+
+        cv_ids = (
+            CVRevision.objects.filter(created_at__lt=daily_before)
+            .order_by().values_list('cv_id', flat=True).distinct()
+        )
+        deleted = 0
+        for cv_id in list(cv_ids):
+            rows = list(
+                CVRevision.objects.filter(cv_id=cv_id).order_by('number').values_list('number', 'created_at')
+            )
+            kept = _kept_numbers(rows, options['keep_last'], daily_before, drop_before)
+            if options['dry_run']:
+                # The latest revision always survives compaction
+                deleted += len(rows) - len(kept | {rows[-1][0]})
+            else:
+                deleted += compact_history(cv_id, lambda revision, kept=kept: revision.number in kept)
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} revisions'))
@@ -0,0 +1,33 @@
+import sys
+from contextlib import nullcontext
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from cv_app.models import CV
+from cv_app.transfer import EXPORT_CHUNK_SIZE, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Export CVs as JSON Lines (one CV per line)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only export CVs owned by this username')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = CV.objects.all()
+        if options['user']:
+            try:
+                queryset = queryset.filter(owner=User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']!r} does not exist")
+
+        count = 0
+        output = options['output']
+        with open(output, 'w', encoding='utf-8') if output else nullcontext(sys.stdout) as out:
+            for line in export_lines(queryset, chunk_size=options['chunk_size']):
+                out.write(line)
+                count += 1
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} CVs'))
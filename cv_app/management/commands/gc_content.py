@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import ProtectedError
+from django.utils import timezone
+
+from cv_app.models import CVContent
+
+
+class Command(BaseCommand):
+    help = 'Delete shared CV section contents that no CV references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Keep contents younger than this many seconds (CVs still being saved)',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options['min_age'])
+        orphans = CVContent.objects.filter(cvs__isnull=True, created_at__lt=cutoff)
+        total = CVContent.objects.count()
+        if options['dry_run']:
+            deleted = orphans.count()
+        else:
+            try:
+                deleted, _ = orphans.delete()
+            except ProtectedError:
+                # A CV picked up one of the rows meanwhile; the next run gets the rest
+                self.stderr.write('Some contents were referenced again while deleting; nothing deleted')
+                deleted = 0
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{total} contents; {verb} {deleted} unreferenced'))
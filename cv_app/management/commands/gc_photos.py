@@ -0,0 +1,64 @@
+import posixpath
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from cv_app.images import PHOTO_DIR
+from cv_app.models import CV
+from cv_app.storage import ADDRESSED_NAME
+
+
+def _blob_key(name):
+    # Variants share the digest of their source photo, so they live and die together
+    match = ADDRESSED_NAME.match(posixpath.basename(name))
+    return match['digest'] if match else name
+
+
+class Command(BaseCommand):
+    help = 'Delete stored CV photos that no CV references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Keep files younger than this many seconds (uploads still being saved)',
+        )
+
+    def handle(self, *args, **options):
+        storage = CV._meta.get_field('photo').storage
+        refs = {}
+        rows = (
+            CV.objects.exclude(photo='').exclude(photo__isnull=True)
+            .order_by().values('photo').annotate(refs=Count('id'))
+        )
+        for row in rows:
+            key = _blob_key(row['photo'])
+            refs[key] = refs.get(key, 0) + row['refs']
+
+        try:
+            _, files = storage.listdir(PHOTO_DIR)
+        except FileNotFoundError:
+            files = []
+
+        cutoff = time.time() - options['min_age']
+        deleted = freed = 0
+        for filename in files:
+            name = posixpath.join(PHOTO_DIR, filename)
+            if refs.get(_blob_key(name)):
+                continue
+            if storage.get_modified_time(name).timestamp() > cutoff:
+                continue
+            size = storage.size(name)
+            if options['dry_run']:
+                self.stdout.write(f'Would delete {name}')
+            else:
+                storage.delete(name)
+            deleted += 1
+            freed += size
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(refs)} photos referenced by {sum(refs.values())} CVs; '
+            f'{verb} {deleted} unreferenced files ({freed} bytes)'
+        ))
@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from cv_app.transfer import IMPORT_BATCH_SIZE, import_lines
+
+
+class Command(BaseCommand):
+    help = 'Import CVs from a JSON Lines file produced by export_cvs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON Lines file to read')
+        parser.add_argument('--user', help='Assign every imported CV to this username instead of each line\'s owner')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        owner = None
+        if options['user']:
+            try:
+                owner = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']!r} does not exist")
+
+        with open(options['path'], encoding='utf-8') as fh:
+            result = import_lines(fh, owner=owner, batch_size=options['batch_size'])
+
+        for lineno, message in result.errors:
+            self.stderr.write(f'line {lineno}: {message}')
+        style = self.style.WARNING if result.errors else self.style.SUCCESS
+        self.stdout.write(style(f'Imported {result.created} CVs, skipped {len(result.errors)} invalid lines'))
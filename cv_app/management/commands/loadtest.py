@@ -0,0 +1,122 @@
+import json
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _login(base_url, username, password):
+    """Return an opener carrying an authenticated session for ``base_url``."""
+    jar = CookieJar()
+    opener = build_opener(HTTPCookieProcessor(jar))
+    login_url = urljoin(base_url, '/accounts/login/')
+    opener.open(login_url).read()
+    csrf = next((c.value for c in jar if c.name == 'csrftoken'), '')
+    body = urlencode({'username': username, 'password': password, 'csrfmiddlewaretoken': csrf}).encode()
+    response = opener.open(Request(login_url, data=body, headers={'Referer': login_url}))
+    response.read()
+    if not any(c.name == 'sessionid' for c in jar):
+        raise CommandError(f'Could not log in as {username!r} at {login_url}')
+    return opener
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent requests at a running server and print throughput and latency as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running server')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Path to request, repeatable (default: /dashboard/)')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous clients')
+        parser.add_argument('--requests', type=int, default=500, help='Total requests across all clients')
+        parser.add_argument('--output', help='Write results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        base_url = options['url']
+        paths = options['paths'] or ['/dashboard/']
+        concurrency = options['concurrency']
+        total = options['requests']
+
+        # One session per client, so server-side session caching behaves as with real users
+        openers = [_login(base_url, options['username'], options['password']) for _ in range(concurrency)]
+        lock = threading.Lock()
+        issued = 0
+        timings = []
+        errors = {}
+
+        def client(opener):
+            nonlocal issued
+            while True:
+                with lock:
+                    if issued >= total:
+                        return
+                    n = issued
+                    issued += 1
+                url = urljoin(base_url, paths[n % len(paths)])
+                start = time.perf_counter()
+                try:
+                    with opener.open(url, timeout=60) as response:
+                        response.read()
+                    status = 200
+                except HTTPError as exc:
+                    status = exc.code
+                except (URLError, OSError) as exc:
+                    status = type(exc).__name__
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    if status == 200:
+                        timings.append(elapsed)
+                    else:
+                        errors[str(status)] = errors.get(str(status), 0) + 1
+
+        self.stderr.write(f'{total} requests to {", ".join(paths)} with {concurrency} concurrent clients')
+        threads = [threading.Thread(target=client, args=(opener,)) for opener in openers]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'url': base_url,
+                'paths': paths,
+                'params': {k: options[k] for k in ('concurrency', 'requests')},
+            },
+            'results': {
+                'ok': len(timings),
+                'errors': errors,
+                'wall_s': round(wall, 3),
+                'requests_per_s': round(len(timings) / wall, 1) if wall else 0,
+                'latency_ms': {
+                    'mean': round(statistics.fmean(timings), 3),
+                    'p50': round(_percentile(timings, 50), 3),
+                    'p95': round(_percentile(timings, 95), 3),
+                    'p99': round(_percentile(timings, 99), 3),
+                    'max': round(max(timings), 3),
+                } if timings else None,
+            },
+        }
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
@@ -1,9 +1,16 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from cv_app.models import CVTemplate
+from cv_app.registry import template_registry
+from cv_app.rendering import template_source_signature
 
 class Command(BaseCommand):
     help = 'Populate CV templates'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--rerender', action='store_true',
+                            help='Run rerender_cvs for templates whose HTML or CSS changed')
+
     def handle(self, *args, **kwargs):
         templates = [
             {'slug': 'classic', 'name': 'Classic', 'preview_image': 'img/template_previews/classic.png'},
@@ -12,7 +19,9 @@ class Command(BaseCommand):
             {'slug': 'advanced', 'name': 'Advanced', 'preview_image': 'img/template_previews/advanced.png'},
         ]
 
+        changed = []
         for template_data in templates:
+            template_data['render_signature'] = template_source_signature(template_data['slug'])
             obj, created = CVTemplate.objects.get_or_create(
                 slug=template_data['slug'],
                 defaults=template_data
@@ -26,7 +35,21 @@ class Command(BaseCommand):
                 if obj.preview_image != template_data['preview_image']:
                     obj.preview_image = template_data['preview_image']
                     updated = True
+                if obj.render_signature != template_data['render_signature']:
+                    # Rows from before signatures were recorded have nothing known to be stale
+                    if obj.render_signature:
+                        changed.append(obj.slug)
+                    obj.render_signature = template_data['render_signature']
+                    updated = True
                 if updated:
                     obj.save()
 
+        template_registry.invalidate()
         self.stdout.write(self.style.SUCCESS('Successfully populated templates'))
+        if changed:
+            if kwargs['rerender']:
+                call_command('rerender_cvs', templates=changed, stdout=self.stdout, stderr=self.stderr)
+            else:
+                flags = ' '.join(f'--template {slug}' for slug in changed)
+                self.stdout.write(f'Templates changed: {", ".join(changed)}; '
+                                  f'run "manage.py rerender_cvs {flags}" to refresh their CVs')
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+
+from cv_app.models import CV, CVTemplate
+from cv_app.prewarm import init_worker, render_chunk, shared_cache
+from cv_app.rendering import template_source_signature
+
+
+def _load_state(path, run_key):
+    try:
+        with open(path, encoding='utf-8') as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return 0
+    return state.get('done_through', 0) if state.get('run') == run_key else 0
+
+
+def _save_state(path, run_key, done_through):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        json.dump({'run': run_key, 'done_through': done_through}, fh)
+    os.replace(tmp, path)
+
+
+class Command(BaseCommand):
+    help = 'Re-render cached previews, PDFs and public snapshots of CVs, e.g. after a template change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', action='append', dest='templates',
+                            help='Only CVs using this template slug, repeatable (default: all)')
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                            help='Worker processes; 1 renders in this process (default: half the CPUs)')
+        parser.add_argument('--chunk-size', type=int, default=50, help='CVs per task handed to a worker')
+        parser.add_argument('--max-rate', type=float, default=0,
+                            help='Start at most this many CVs per second (0: no limit)')
+        parser.add_argument('--nice', type=int, default=10, help='Scheduling niceness added in worker processes')
+        parser.add_argument('--compact', action='store_true', help='Also render the compact print variants')
+        parser.add_argument('--no-pdf', action='store_false', dest='pdf', help='Do not write PDFs')
+        parser.add_argument('--force', action='store_true', help='Rewrite PDFs that already exist')
+        parser.add_argument('--state', default=str(Path(settings.BASE_DIR) / 'tmp' / 'rerender-state.json'),
+                            help='Progress file an interrupted run resumes from')
+        parser.add_argument('--restart', action='store_true', help='Ignore the progress of an earlier run')
+
+    def handle(self, *args, **options):
+        known = set(CVTemplate.objects.values_list('slug', flat=True))
+        slugs = sorted(options['templates'] or known)
+        unknown = set(slugs) - known
+        if unknown:
+            raise CommandError(f'Unknown template(s): {", ".join(sorted(unknown))}')
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1')
+
+        task = {k: options[k] for k in ('compact', 'pdf', 'force')}
+        # A run only resumes another with the same work and the same template sources
+        run_key = hashlib.sha1(json.dumps({
+            'templates': slugs, 'task': task,
+            'sources': {slug: template_source_signature(slug) for slug in slugs},
+        }, sort_keys=True).encode()).hexdigest()
+        state_path = Path(options['state'])
+        done_through = 0 if options['restart'] else _load_state(state_path, run_key)
+
+        cvs = CV.objects.filter(pk__gt=done_through)
+        if options['templates']:
+            match = Q(template__slug__in=slugs)
+            if 'classic' in slugs:
+                # CVs without a template render as classic
+                match |= Q(template__isnull=True)
+            cvs = cvs.filter(match)
+        ids = list(cvs.order_by('pk').values_list('pk', flat=True))
+        size = options['chunk_size']
+        chunks = [ids[i:i + size] for i in range(0, len(ids), size)]
+
+        if done_through:
+            self.stderr.write(f'Resuming after CV {done_through}')
+        if not shared_cache():
+            self.stderr.write('The cache is local to each process; preview bodies are not pre-warmed')
+        self.stderr.write(f'{len(ids)} CVs using {", ".join(slugs)} in {len(chunks)} chunks, '
+                          f'{options["workers"]} worker(s)')
+
+        started = time.monotonic()
+        done = 0
+        failures = []
+        finished = set()
+        next_index = 0  # Chunks before this one have all finished
+
+        def throttle(submitted):
+            if options['max_rate'] > 0:
+                delay = started + submitted / options['max_rate'] - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+        def complete(index, result):
+            nonlocal done, next_index
+            count, failed = result
+            done += count
+            failures.extend(failed)
+            finished.add(index)
+            advanced = False
+            while next_index in finished:
+                finished.discard(next_index)
+                next_index += 1
+                advanced = True
+            if advanced:
+                _save_state(state_path, run_key, chunks[next_index - 1][-1])
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0
+            eta = (len(ids) - done) / rate if rate else 0
+            self.stderr.write(f'{done}/{len(ids)} CVs ({done * 100 // len(ids)}%), {rate:.1f}/s, '
+                              f'ETA {eta:.0f}s, {len(failures)} failed')
+
+        submitted = 0
+        if options['workers'] == 1:
+            for index, chunk in enumerate(chunks):
+                throttle(submitted)
+                submitted += len(chunk)
+                complete(index, render_chunk(chunk, task))
+        elif chunks:
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker,
+                                     initargs=(options['nice'],)) as pool:
+                pending = {}
+                queue = iter(enumerate(chunks))
+                while True:
+                    # Keep a bounded number of chunks in flight so --max-rate and Ctrl-C take effect promptly
+                    while len(pending) < options['workers'] * 2:
+                        item = next(queue, None)
+                        if item is None:
+                            break
+                        throttle(submitted)
+                        submitted += len(item[1])
+                        pending[pool.submit(render_chunk, item[1], task)] = item[0]
+                    if not pending:
+                        break
+                    ready, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in ready:
+                        complete(pending.pop(future), future.result())
+
+        state_path.unlink(missing_ok=True)
+        for cv_id, error in failures[:20]:
+            self.stderr.write(f'CV {cv_id}: {error}')
+        summary = f'Re-rendered {done - len(failures)} CVs in {time.monotonic() - started:.1f}s'
+        if failures:
+            self.stdout.write(self.style.WARNING(f'{summary}; {len(failures)} failed'))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cv_app", "0002_add_photo_to_cv"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cv",
+            name="experience_json",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="cv",
+            name="education_json",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="cv",
+            name="projects_json",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
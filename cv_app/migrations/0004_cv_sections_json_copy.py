@@ -0,0 +1,62 @@
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+SECTIONS = ("experience", "education", "projects")
+
+
+def _decode(raw):
+    if not raw:
+        return []
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        return []
+    return value if isinstance(value, list) else []
+
+
+def _copy_in_batches(CV, read_field, write_field, convert):
+    # Walk the table by primary key so only one batch is held in memory at a
+    # time and no cursor stays open while rows are being updated.
+    last_pk = 0
+    fields = [read_field(name) for name in SECTIONS]
+    while True:
+        batch = list(
+            CV.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", *fields)[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for cv in batch:
+            for name in SECTIONS:
+                setattr(cv, write_field(name), convert(getattr(cv, read_field(name))))
+        CV.objects.bulk_update(batch, [write_field(name) for name in SECTIONS])
+        last_pk = batch[-1].pk
+
+
+def text_to_json(apps, schema_editor):
+    CV = apps.get_model("cv_app", "CV")
+    _copy_in_batches(CV, lambda n: n, lambda n: f"{n}_json", _decode)
+
+
+def json_to_text(apps, schema_editor):
+    CV = apps.get_model("cv_app", "CV")
+    _copy_in_batches(
+        CV,
+        lambda n: f"{n}_json",
+        lambda n: n,
+        lambda value: json.dumps(value or [], ensure_ascii=False),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cv_app", "0003_cv_sections_json_add"),
+    ]
+
+    operations = [
+        migrations.RunPython(text_to_json, json_to_text),
+    ]
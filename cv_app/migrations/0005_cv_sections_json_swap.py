@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cv_app", "0004_cv_sections_json_copy"),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name="cv", name="experience"),
+        migrations.RemoveField(model_name="cv", name="education"),
+        migrations.RemoveField(model_name="cv", name="projects"),
+        migrations.RenameField(model_name="cv", old_name="experience_json", new_name="experience"),
+        migrations.RenameField(model_name="cv", old_name="education_json", new_name="education"),
+        migrations.RenameField(model_name="cv", old_name="projects_json", new_name="projects"),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:21
+
+import cv_app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0005_cv_sections_json_swap'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cv',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=cv_app.storage.photo_storage, upload_to='photos/'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0006_cv_photo_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestTimingSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_name', models.CharField(db_index=True, max_length=200)),
+                ('period_end', models.DateTimeField()),
+                ('pid', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('p50_ms', models.FloatField()),
+                ('p95_ms', models.FloatField()),
+                ('p99_ms', models.FloatField()),
+                ('max_ms', models.FloatField()),
+                ('mean_db_ms', models.FloatField()),
+                ('mean_queries', models.FloatField()),
+                ('mean_template_ms', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'request timing summary',
+                'verbose_name_plural': 'request timing summaries',
+                'ordering': ['-period_end'],
+            },
+        ),
+    ]
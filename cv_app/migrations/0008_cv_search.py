@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+from cv_app.search import drop_search_schema, ensure_search_schema
+
+BATCH_SIZE = 500
+
+
+# Frozen copy of cv_app.search.build_search_text as of this migration, for the
+# historical model, whose sections are still JSON fields on the CV row
+def _flatten(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+    elif value:
+        yield str(value)
+
+
+def build_search_text(cv):
+    parts = [cv.title, cv.full_name, cv.job_title, cv.summary, cv.skills]
+    for field in ("experience", "education", "projects"):
+        parts.extend(_flatten(getattr(cv, field)))
+    return "\n".join(p for p in parts if p)
+
+
+def fill_search_text(apps, schema_editor):
+    CV = apps.get_model("cv_app", "CV")
+    last_pk = 0
+    while True:
+        batch = list(CV.objects.filter(pk__gt=last_pk).order_by("pk")[:BATCH_SIZE])
+        if not batch:
+            break
+        for cv in batch:
+            cv.search_text = build_search_text(cv)
+        CV.objects.bulk_update(batch, ["search_text"])
+        last_pk = batch[-1].pk
+
+
+def create_index(apps, schema_editor):
+    ensure_search_schema(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_schema(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0007_request_timing_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('cv_app', '0008_cv_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='cv',
+            options={},
+        ),
+        # Build the composite index before dropping the owner_id index it replaces
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['owner', '-updated_at', '-id'], name='cv_app_cv_owner_updated_idx'),
+        ),
+        migrations.AlterField(
+            model_name='cv',
+            name='owner',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='cvs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
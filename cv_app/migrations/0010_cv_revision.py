@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0009_cv_owner_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('digest', models.CharField(max_length=40)),
+                ('data', models.BinaryField()),
+                ('cv', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='cv_app.cv')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='cvrevision',
+            constraint=models.UniqueConstraint(fields=('cv', 'number'), name='cv_app_cvrevision_cv_number_uniq'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cv_app", "0010_cv_revision"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CVContent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("digest", models.CharField(max_length=64, unique=True)),
+                ("experience", models.JSONField(blank=True, default=list)),
+                ("education", models.JSONField(blank=True, default=list)),
+                ("projects", models.JSONField(blank=True, default=list)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "CV content",
+                "verbose_name_plural": "CV contents",
+            },
+        ),
+        migrations.AddField(
+            model_name="cv",
+            name="content",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="cvs",
+                to="cv_app.cvcontent",
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+SECTIONS = ("experience", "education", "projects")
+
+
+def _digest(values):
+    # Must match cv_app.models.content_digest
+    payload = json.dumps([values[name] or [] for name in SECTIONS],
+                         sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def sections_to_content(apps, schema_editor):
+    CV = apps.get_model("cv_app", "CV")
+    CVContent = apps.get_model("cv_app", "CVContent")
+    # Walk the table by primary key so only one batch is held in memory at a
+    # time; identical sections across batches resolve to the same row.
+    last_pk = 0
+    while True:
+        batch = list(
+            CV.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", *SECTIONS)[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        wanted = {}
+        digests = {}
+        for cv in batch:
+            values = {name: getattr(cv, name) or [] for name in SECTIONS}
+            if any(values.values()):
+                digests[cv.pk] = _digest(values)
+                wanted.setdefault(digests[cv.pk], values)
+        CVContent.objects.bulk_create(
+            [CVContent(digest=digest, **values) for digest, values in wanted.items()], ignore_conflicts=True)
+        ids = dict(CVContent.objects.filter(digest__in=list(wanted)).values_list("digest", "id"))
+        for cv in batch:
+            cv.content_id = ids.get(digests.get(cv.pk))
+        CV.objects.bulk_update(batch, ["content"])
+        last_pk = batch[-1].pk
+
+
+def content_to_sections(apps, schema_editor):
+    CV = apps.get_model("cv_app", "CV")
+    last_pk = 0
+    while True:
+        batch = list(
+            CV.objects.filter(pk__gt=last_pk)
+            .select_related("content")
+            .order_by("pk")
+            .only("pk", "content")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for cv in batch:
+            for name in SECTIONS:
+                setattr(cv, name, getattr(cv.content, name) if cv.content else [])
+        CV.objects.bulk_update(batch, list(SECTIONS))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cv_app", "0011_cv_content_add"),
+    ]
+
+    operations = [
+        migrations.RunPython(sections_to_content, content_to_sections),
+    ]
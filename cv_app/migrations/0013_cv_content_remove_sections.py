@@ -0,0 +1,14 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cv_app", "0012_cv_content_copy"),
+    ]
+
+    operations = [
+        migrations.RemoveField(model_name="cv", name="experience"),
+        migrations.RemoveField(model_name="cv", name="education"),
+        migrations.RemoveField(model_name="cv", name="projects"),
+    ]
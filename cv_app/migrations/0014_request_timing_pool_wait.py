@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0013_cv_content_remove_sections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requesttimingsummary',
+            name='mean_pool_wait_ms',
+            field=models.FloatField(default=0),
+        ),
+    ]
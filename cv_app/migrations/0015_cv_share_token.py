@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0014_request_timing_pool_wait'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='share_token',
+            field=models.CharField(blank=True, editable=False, max_length=43, null=True, unique=True),
+        ),
+    ]
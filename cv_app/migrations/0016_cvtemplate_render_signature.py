@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv_app', '0015_cv_share_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cvtemplate',
+            name='render_signature',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40),
+        ),
+    ]
@@ -1,6 +1,14 @@
+import copy
+import hashlib
+import json
+
 from django.db import models
 from django.contrib.auth.models import User
-import json
+from django.utils import timezone
+
+from .images import variant_names
+from .search import SEARCH_SOURCE_FIELDS, build_search_text
+from .storage import photo_storage
 
 
 class CVTemplate(models.Model):
@@ -8,13 +16,84 @@ class CVTemplate(models.Model):
     name = models.CharField(max_length=100)
     preview_image = models.CharField(max_length=200, blank=True)
     active = models.BooleanField(default=True)
+    # Source digest recorded by populate_templates (see cv_app.rendering.template_source_signature)
+    render_signature = models.CharField(max_length=40, blank=True, default='', editable=False)
 
     def __str__(self):
         return self.name
 
 
+SECTION_FIELDS = ('experience', 'education', 'projects')
+
+
+def content_digest(sections):
+    payload = json.dumps([sections.get(field) or [] for field in SECTION_FIELDS],
+                         sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CVContent(models.Model):
+    """The section lists of a CV, shared by every CV whose sections are identical.
+
+    Rows are keyed by a hash of their content and never change. Editing a
+    CV's sections points it at another row (see ``CV.save``), so copies of a
+    CV share one row until one of them is edited. ``manage.py gc_content``
+    deletes rows that no CV references any more.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    experience = models.JSONField(default=list, blank=True)
+    education = models.JSONField(default=list, blank=True)
+    projects = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'CV content'
+        verbose_name_plural = 'CV contents'
+
+    def __str__(self):
+        return self.digest[:12]
+
+    @classmethod
+    def attach(cls, cvs):
+        """Point every CV in ``cvs`` with edited sections at the row holding them.
+
+        Missing rows are created in one insert, so this suits batches for
+        ``bulk_create`` as well as single saves.
+        """
+        wanted = {}
+        targets = []
+        for cv in cvs:
+            if not cv._sections_changed():
+                continue
+            values = cv._sections()
+            if any(values.values()):
+                digest = content_digest(values)
+                wanted.setdefault(digest, values)
+                targets.append((cv, digest, values))
+            else:
+                # CVs without sections need no row
+                cv.content = None
+                cv._cache_sections(values, None)
+        if not wanted:
+            return
+        cls.objects.bulk_create(
+            [cls(digest=digest, **values) for digest, values in wanted.items()], ignore_conflicts=True)
+        ids = dict(cls.objects.filter(digest__in=list(wanted)).values_list('digest', 'id'))
+        for cv, digest, values in targets:
+            cv.content_id = ids[digest]
+            cv._cache_sections(values, digest)
+
+
+def _section_property(name):
+    return property(
+        lambda self: self._sections()[name],
+        lambda self, value: self._set_section(name, value),
+    )
+
+
 class CV(models.Model):
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cvs')
+    # Indexed by the leading column of cv_app_cv_owner_updated_idx below
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cvs', db_index=False)
     title = models.CharField(max_length=200)
     template = models.ForeignKey(CVTemplate, on_delete=models.SET_NULL, null=True)
 
@@ -27,7 +106,7 @@ class CV(models.Model):
     links = models.TextField(blank=True, help_text="LinkedIn, GitHub, Portfolio (one per line)")
 
     # Optional Photo
-    photo = models.ImageField(upload_to='photos/', blank=True, null=True)
+    photo = models.ImageField(upload_to='photos/', storage=photo_storage, blank=True, null=True)
 
     # Summary
     summary = models.TextField(blank=True)
@@ -35,50 +114,184 @@ class CV(models.Model):
     # Skills
     skills = models.TextField(blank=True, help_text="Comma-separated or grouped")
 
-    # Experience (JSON field)
-    experience = models.TextField(blank=True, help_text="JSON format")
+    # Experience, education and projects (lists of dicts), stored in a shared
+    # CVContent row and read and assigned through the properties below
+    content = models.ForeignKey(
+        CVContent, on_delete=models.PROTECT, related_name='cvs', null=True, blank=True, editable=False)
+    experience = _section_property('experience')
+    education = _section_property('education')
+    projects = _section_property('projects')
 
-    # Education (JSON field)
-    education = models.TextField(blank=True, help_text="JSON format")
+    # Set while the CV is published as a public snapshot (see cv_app.sharing)
+    share_token = models.CharField(max_length=43, unique=True, null=True, blank=True, editable=False)
 
-    # Projects (JSON field)
-    projects = models.TextField(blank=True, help_text="JSON format")
+    # Denormalized text indexed for full-text search (see cv_app.search)
+    search_text = models.TextField(blank=True, default='', editable=False)
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-updated_at']
+        # No default ordering: it would add a sort to every query, counts and
+        # existence checks included. Listings order explicitly.
+        indexes = [
+            # Serves filter(owner=...).order_by('-updated_at', '-id') without a sort
+            models.Index(fields=['owner', '-updated_at', '-id'], name='cv_app_cv_owner_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.owner.username}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Baseline the next revision is diffed against (see cv_app.revisions)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {'content' if field in SECTION_FIELDS else field for field in update_fields}
+        if (update_fields is None or 'content' in update_fields) and self._sections_changed():
+            CVContent.attach([self])
+        if update_fields is None or SEARCH_SOURCE_FIELDS.intersection(update_fields):
+            self.search_text = build_search_text(self)
+            if update_fields is not None:
+                update_fields.add('search_text')
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def _sections(self):
+        # Sections assigned since the last save win; otherwise they are read
+        # from the content row once and reused until content_id changes.
+        cached = self.__dict__.get('_section_values')
+        if cached is not None and (cached[0] == self.content_id or self.__dict__.get('_sections_dirty')):
+            return cached[1]
+        content = self.content
+        stored = {field: getattr(content, field) if content else [] for field in SECTION_FIELDS}
+        loaded = self.__dict__.get('_loaded_values')
+        if loaded is not None and loaded.get('content_id') == self.content_id:
+            # Part of the baseline the next revision is diffed against
+            loaded.update(stored)
+        # The CV gets its own copy, so in-place edits leave the row and the
+        # baseline untouched and show up as a digest change in save()
+        values = copy.deepcopy(stored)
+        self._cache_sections(values, content.digest if content else None)
+        return values
+
+    def _cache_sections(self, values, digest):
+        self.__dict__['_section_values'] = (self.content_id, values, digest)
+        self.__dict__['_sections_dirty'] = False
+
+    def _set_section(self, name, value):
+        values = {**self._sections(), name: value}
+        self.__dict__['_section_values'] = (self.content_id, values, None)
+        self.__dict__['_sections_dirty'] = True
+
+    def _sections_changed(self):
+        """Whether the sections differ from the content row, assigned or edited in place."""
+        cached = self.__dict__.get('_section_values')
+        if cached is None:
+            return False
+        if self.__dict__.get('_sections_dirty'):
+            return True
+        content_id, values, digest = cached
+        if content_id != self.content_id:
+            # content was repointed directly; the cache is stale, not edited
+            return False
+        if digest is None:
+            return any(values.values())
+        return content_digest(values) != digest
+
+    def _get_section(self, field_name, parse):
+        # Templates call each accessor several times per render; decode the raw
+        # value once and reuse it until the field is reassigned or refreshed.
+        raw = getattr(self, field_name)
+        cache = self.__dict__.setdefault('_section_cache', {})
+        cached = cache.get(field_name)
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        value = parse(raw) if raw else []
+        cache[field_name] = (raw, value)
+        return value
+
+    @staticmethod
+    def _as_list(raw):
+        return raw if isinstance(raw, list) else []
+
+    @staticmethod
+    def _parse_lines(raw):
+        return [link.strip() for link in raw.split('\n') if link.strip()]
+
+    def refresh_from_db(self, *args, **kwargs):
+        for name in ('_section_cache', '_section_values', '_sections_dirty'):
+            self.__dict__.pop(name, None)
+        super().refresh_from_db(*args, **kwargs)
+
     def get_experience_list(self):
-        if self.experience:
-            try:
-                return json.loads(self.experience)
-            except json.JSONDecodeError:
-                return []
-        return []
+        return self._get_section('experience', self._as_list)
 
     def get_education_list(self):
-        if self.education:
-            try:
-                return json.loads(self.education)
-            except json.JSONDecodeError:
-                return []
-        return []
+        return self._get_section('education', self._as_list)
 
     def get_projects_list(self):
-        if self.projects:
-            try:
-                return json.loads(self.projects)
-            except json.JSONDecodeError:
-                return []
-        return []
+        return self._get_section('projects', self._as_list)
 
     def get_links_list(self):
-        if self.links:
-            return [link.strip() for link in self.links.split('\n') if link.strip()]
-        return []
+        return self._get_section('links', self._parse_lines)
+
+    def get_photo_variants(self):
+        """URLs of the resized photo variants, or None when only the original exists."""
+        if not self.photo:
+            return None
+        names = variant_names(self.photo.name)
+        if names is None:
+            return None
+        storage = self.photo.storage
+        return {kind: storage.url(name) for kind, name in names.items()}
+
+
+class CVRevision(models.Model):
+    """One saved state of a CV, stored as a compressed delta or snapshot (see cv_app.revisions)."""
+    cv = models.ForeignKey(CV, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+    # Deltas since the last snapshot; 0 means this row holds the full state
+    depth = models.PositiveSmallIntegerField(default=0)
+    digest = models.CharField(max_length=40)
+    data = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cv', 'number'], name='cv_app_cvrevision_cv_number_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.cv_id} r{self.number}"
+
+
+class RequestTimingSummary(models.Model):
+    """Per-URL latency percentiles flushed by cv_builder.profiling.ProfilingMiddleware."""
+    url_name = models.CharField(max_length=200, db_index=True)
+    period_end = models.DateTimeField()
+    pid = models.PositiveIntegerField()
+    count = models.PositiveIntegerField()
+    p50_ms = models.FloatField()
+    p95_ms = models.FloatField()
+    p99_ms = models.FloatField()
+    max_ms = models.FloatField()
+    mean_db_ms = models.FloatField()
+    mean_queries = models.FloatField()
+    mean_template_ms = models.FloatField()
+    mean_pool_wait_ms = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-period_end']
+        verbose_name = 'request timing summary'
+        verbose_name_plural = 'request timing summaries'
+
+    def __str__(self):
+        return f"{self.url_name} @ {self.period_end:%Y-%m-%d %H:%M}"
@@ -0,0 +1,272 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import close_old_connections
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import (
+    HRFlowable, Image, ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer, Table,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fonts and colours mirror static/css/templates/<slug>.css as closely as the
+# standard PDF fonts allow.
+PDF_STYLES = {
+    'classic': {
+        'font': 'Times-Roman', 'bold': 'Times-Bold', 'italic': 'Times-Italic',
+        'accent': '#2c3e50', 'rule': '#3498db', 'muted': '#7f8c8d', 'upper': True, 'photo': False,
+    },
+    'modern': {
+        'font': 'Helvetica', 'bold': 'Helvetica-Bold', 'italic': 'Helvetica-Oblique',
+        'accent': '#667eea', 'rule': '#e6e9ff', 'muted': '#7f8c8d', 'upper': False, 'photo': False,
+    },
+    'minimal': {
+        'font': 'Courier', 'bold': 'Courier-Bold', 'italic': 'Courier-Oblique',
+        'accent': '#000000', 'rule': '#000000', 'muted': '#333333', 'upper': True, 'photo': False,
+    },
+    'advanced': {
+        'font': 'Helvetica', 'bold': 'Helvetica-Bold', 'italic': 'Helvetica-Oblique',
+        'accent': '#3547e6', 'rule': '#eaeaea', 'muted': '#666666', 'upper': False, 'photo': True,
+    },
+}
+
+
+def _styles(spec, compact):
+    base = 9 if compact else 10
+    accent = colors.HexColor(spec['accent'])
+    muted = colors.HexColor(spec['muted'])
+    return {
+        'name': ParagraphStyle('name', fontName=spec['bold'], fontSize=base * 2.2, leading=base * 2.6, textColor=accent),
+        'job': ParagraphStyle('job', fontName=spec['font'], fontSize=base + 2, leading=base + 5, textColor=muted),
+        'contact': ParagraphStyle('contact', fontName=spec['font'], fontSize=base - 0.5, leading=base + 3),
+        'h2': ParagraphStyle('h2', fontName=spec['bold'], fontSize=base + 2, leading=base + 5,
+                             textColor=accent, spaceBefore=base, spaceAfter=2),
+        'h3': ParagraphStyle('h3', fontName=spec['bold'], fontSize=base + 0.5, leading=base + 3, spaceBefore=4),
+        'meta': ParagraphStyle('meta', fontName=spec['italic'], fontSize=base - 0.5, leading=base + 2.5, textColor=muted),
+        'body': ParagraphStyle('body', fontName=spec['font'], fontSize=base, leading=base + 3.5),
+    }
+
+
+def _p(text, style):
+    return Paragraph(escape(str(text or '')).replace('\n', '<br/>'), style)
+
+
+def _section(story, title, spec, st):
+    story.append(_p(title.upper() if spec['upper'] else title, st['h2']))
+    story.append(HRFlowable(width='100%', thickness=1, color=colors.HexColor(spec['rule']), spaceAfter=4))
+
+
+def _header(cv, spec, st):
+    lines = [_p(cv.full_name, st['name'])]
+    if cv.job_title:
+        lines.append(_p(cv.job_title, st['job']))
+    contact = ' | '.join(v for v in (cv.email, cv.phone, cv.location) if v)
+    if contact:
+        lines.append(_p(contact, st['contact']))
+    links = cv.get_links_list()
+    if links:
+        lines.append(_p('  '.join(links), st['contact']))
+
+    photo = None
+    if spec['photo'] and cv.photo:
+        try:
+            photo = Image(cv.photo.path, width=28 * mm, height=28 * mm)
+        except (OSError, NotImplementedError, ValueError):
+            logger.warning('Could not load photo for CV %s', cv.pk)
+    if photo is None:
+        return lines
+    table = Table([[photo, lines]], colWidths=[32 * mm, None])
+    table.setStyle([('VALIGN', (0, 0), (-1, -1), 'MIDDLE'), ('LEFTPADDING', (0, 0), (-1, -1), 0)])
+    return [table]
+
+
+def render_cv_pdf(cv, template_slug, print_compact=False):
+    """Render ``cv`` as a PDF laid out like ``template_slug`` and return the bytes."""
+    spec = PDF_STYLES.get(template_slug, PDF_STYLES['classic'])
+    st = _styles(spec, print_compact)
+    margin = (12 if print_compact else 18) * mm
+
+    story = _header(cv, spec, st)
+    story.append(Spacer(1, 4 * mm))
+
+    if cv.summary:
+        _section(story, 'Profile' if template_slug == 'advanced' else 'Summary', spec, st)
+        story.append(_p(cv.summary, st['body']))
+    if cv.skills:
+        _section(story, 'Skills', spec, st)
+        story.append(_p(cv.skills, st['body']))
+
+    experience = cv.get_experience_list()
+    if experience:
+        _section(story, 'Experience', spec, st)
+        for exp in experience:
+            title = ' — '.join(v for v in (exp.get('position'), exp.get('duration')) if v)
+            story.append(_p(title, st['h3']))
+            meta = ' · '.join(v for v in (exp.get('company'), exp.get('website')) if v)
+            if meta:
+                story.append(_p(meta, st['meta']))
+            responsibilities = exp.get('responsibilities') or []
+            if isinstance(responsibilities, str):
+                responsibilities = [responsibilities]
+            if responsibilities:
+                story.append(ListFlowable(
+                    [ListItem(_p(r, st['body']), leftIndent=10) for r in responsibilities],
+                    bulletType='bullet', start='•', leftIndent=10, bulletFontSize=st['body'].fontSize,
+                ))
+            if exp.get('description'):
+                story.append(_p(exp['description'], st['body']))
+
+    education = cv.get_education_list()
+    if education:
+        _section(story, 'Education', spec, st)
+        for edu in education:
+            title = ' — '.join(v for v in (edu.get('degree'), edu.get('duration')) if v)
+            story.append(_p(title, st['h3']))
+            meta = ' · '.join(v for v in (edu.get('institution'), edu.get('status')) if v)
+            if meta:
+                story.append(_p(meta, st['meta']))
+
+    projects = cv.get_projects_list()
+    if projects:
+        _section(story, 'Projects', spec, st)
+        for project in projects:
+            story.append(_p(project.get('name'), st['h3']))
+            if project.get('description'):
+                story.append(_p(project['description'], st['body']))
+            if project.get('technologies'):
+                story.append(_p(f"Technologies: {project['technologies']}", st['meta']))
+
+    buf = BytesIO()
+    doc = SimpleDocTemplate(
+        buf, pagesize=A4, leftMargin=margin, rightMargin=margin, topMargin=margin, bottomMargin=margin,
+        title=cv.title, author=cv.full_name,
+    )
+    doc.build(story)
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# On-disk store and background queue
+# ---------------------------------------------------------------------------
+
+_executor = None
+_pending = {}
+_lock = threading.Lock()
+
+
+def _cv_dir(cv_id):
+    return Path(settings.CV_PDF_ROOT) / str(cv_id)
+
+
+def pdf_path(cv, template_slug, print_compact=False):
+    version = int(cv.updated_at.timestamp() * 1_000_000)
+    suffix = '-compact' if print_compact else ''
+    return _cv_dir(cv.pk) / f'{version}-{template_slug}{suffix}.pdf'
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.CV_PDF_WORKERS, thread_name_prefix='cv-pdf')
+    return _executor
+
+
+def write_pdf(cv, template_slug, print_compact=False):
+    """Render the PDF for the current version of ``cv`` to disk and return its path."""
+    path = pdf_path(cv, template_slug, print_compact)
+    data = render_cv_pdf(cv, template_slug, print_compact)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    # Older versions of this CV are unreachable now
+    prefix = path.name.split('-', 1)[0]
+    for other in path.parent.glob('*.pdf'):
+        if not other.name.startswith(prefix):
+            other.unlink(missing_ok=True)
+    return path
+
+
+def _marker(path, kind):
+    return path.with_name(f'{path.name}.{kind}')
+
+
+def _claim(path):
+    """Create the render lock for ``path``; False while another process holds a fresh one."""
+    lock = _marker(path, 'lock')
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                age = time.time() - lock.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age < settings.CV_PDF_RENDER_TIMEOUT:
+                return False
+            # Left behind by a worker that died mid-render
+            lock.unlink(missing_ok=True)
+    return False
+
+
+def _render_to_disk(cv, template_slug, print_compact, path):
+    # Pool threads are not request threads, so nothing else closes their connections
+    close_old_connections()
+    try:
+        write_pdf(cv, template_slug, print_compact)
+    except Exception:
+        logger.exception('PDF render failed for CV %s (%s)', cv.pk, template_slug)
+        # Reported to the next poll, whichever process it reaches
+        _marker(path, 'failed').touch()
+    finally:
+        _marker(path, 'lock').unlink(missing_ok=True)
+        with _lock:
+            _pending.pop(path, None)
+        close_old_connections()
+
+
+def request_pdf(cv, template_slug, print_compact=False):
+    """Return ``('ready', path)``, ``('pending', None)``, ``('busy', None)`` or ``('failed', None)``.
+
+    Cold renders are queued on a bounded thread pool so the calling worker
+    returns immediately; callers poll until the file is ready. A lock file
+    next to the PDF keeps other processes from queueing the same render.
+    """
+    path = pdf_path(cv, template_slug, print_compact)
+    if path.exists():
+        return 'ready', path
+    failed = _marker(path, 'failed')
+    if failed.exists():
+        # Reported once; the next request tries again
+        failed.unlink(missing_ok=True)
+        return 'failed', None
+    with _lock:
+        if path in _pending:
+            return 'pending', None
+        if len(_pending) >= settings.CV_PDF_MAX_PENDING:
+            return 'busy', None
+        if not _claim(path):
+            return 'pending', None
+        # Load the sections here so the pool thread does not query the database
+        cv.get_experience_list()
+        _pending[path] = _get_executor().submit(_render_to_disk, cv, template_slug, print_compact, path)
+    return 'pending', None
+
+
+def delete_pdfs(cv_id):
+    shutil.rmtree(_cv_dir(cv_id), ignore_errors=True)
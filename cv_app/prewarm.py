@@ -0,0 +1,66 @@
+"""Re-rendering of stored CV artifacts after a template change, for ``manage.py rerender_cvs``.
+
+``render_chunk`` runs in pool worker processes (or inline with one worker).
+For each CV it warms the cached preview bodies, writes the PDFs that are
+missing and rewrites the public snapshot when the CV is published. Failures
+are reported back per CV instead of aborting the chunk.
+"""
+import logging
+import os
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Backends whose entries a separate process cannot share with the web workers
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def init_worker(niceness):
+    """Process pool initializer: set Django up under spawn and lower the priority."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cv_builder.settings')
+        django.setup()
+    if niceness:
+        try:
+            os.nice(niceness)
+        except (AttributeError, OSError):
+            pass
+
+
+def shared_cache():
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def render_chunk(cv_ids, options):
+    """Re-render the artifacts of ``cv_ids``; returns ``(done, [(cv_id, error), ...])``."""
+    from .models import CV
+    from .pdf import pdf_path, write_pdf
+    from .registry import template_registry
+    from .rendering import PREVIEW_TEMPLATE_SLUGS, render_cv_body
+    from .sharing import write_snapshot
+
+    variants = (False, True) if options.get('compact') else (False,)
+    warm = shared_cache()
+    failures = []
+    cvs = CV.objects.filter(pk__in=cv_ids).select_related('content').order_by('pk')
+    for cv in cvs:
+        try:
+            tmpl = template_registry.get_by_id(cv.template_id)
+            slug = tmpl.slug if tmpl else 'classic'
+            for compact in variants:
+                if warm and slug in PREVIEW_TEMPLATE_SLUGS:
+                    render_cv_body(cv, slug, compact)
+                if options.get('pdf', True) and (options.get('force') or not pdf_path(cv, slug, compact).exists()):
+                    write_pdf(cv, slug, compact)
+            if cv.share_token:
+                write_snapshot(cv)
+        except Exception as exc:
+            logger.exception('Re-render failed for CV %s', cv.pk)
+            failures.append((cv.pk, f'{type(exc).__name__}: {exc}'))
+    return len(cv_ids), failures
@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+from .models import CVTemplate
+
+
+class TemplateRegistry:
+    """Process-wide snapshot of the CVTemplate table.
+
+    Templates change rarely, so the table is read once and served from
+    memory. Saves and deletes in this process reload it via signals; other
+    processes pick changes up after ``CV_TEMPLATE_REGISTRY_TTL`` seconds.
+    Returned instances are shared, so treat them as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._by_id = {}
+        self._by_slug = {}
+        self._active = []
+        self._signature = ''
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < settings.CV_TEMPLATE_REGISTRY_TTL:
+            return
+        with self._lock:
+            if self._loaded_at != loaded_at:
+                return
+            templates = list(CVTemplate.objects.order_by('name'))
+            self._by_id = {t.pk: t for t in templates}
+            self._by_slug = {t.slug: t for t in templates}
+            self._active = [t for t in templates if t.active]
+            self._signature = hashlib.md5(repr([
+                (t.pk, t.slug, t.name, t.preview_image, t.active, t.render_signature) for t in templates
+            ]).encode()).hexdigest()
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def signature(self):
+        """Digest of the template table, identical in every process holding the same rows."""
+        self._ensure_loaded()
+        return self._signature
+
+    def active(self):
+        """Active templates ordered by name."""
+        self._ensure_loaded()
+        return list(self._active)
+
+    def get_by_slug(self, slug, active_only=True):
+        self._ensure_loaded()
+        tmpl = self._by_slug.get(slug)
+        if tmpl is None or (active_only and not tmpl.active):
+            return None
+        return tmpl
+
+    def get_by_id(self, pk, active_only=False):
+        self._ensure_loaded()
+        try:
+            tmpl = self._by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+        if tmpl is None or (active_only and not tmpl.active):
+            return None
+        return tmpl
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,69 @@
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+# Slugs that have a cv/body_<slug>.html fragment.
+PREVIEW_TEMPLATE_SLUGS = ('classic', 'modern', 'minimal', 'advanced')
+
+
+def _source_files(template_slug):
+    for name in (f'cv/body_{template_slug}.html', f'cv/preview_{template_slug}.html'):
+        try:
+            yield get_template(name).origin.name
+        except TemplateDoesNotExist:
+            pass
+    for path in ('css/global.css', f'css/templates/{template_slug}.css'):
+        found = finders.find(path)
+        if found:
+            yield found
+
+
+@lru_cache(maxsize=None)
+def template_source_signature(template_slug):
+    """Digest of the HTML and CSS a template renders with, as deployed in this process."""
+    digest = hashlib.sha1(template_slug.encode())
+    for path in _source_files(template_slug):
+        with open(path, 'rb') as fh:
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def _body_cache_key(cv_id, version, template_slug, print_compact):
+    # Bodies cached before a template change are never read back
+    source = template_source_signature(template_slug)[:12]
+    return f'cv-body:{cv_id}:{version}:{template_slug}:{source}:{int(bool(print_compact))}'
+
+
+def _cv_version(cv):
+    return int(cv.updated_at.timestamp() * 1_000_000) if cv.updated_at else 0
+
+
+def render_cv_body(cv, template_slug, print_compact=False):
+    """Return the rendered CV body for ``template_slug``, served from cache when possible."""
+    key = _body_cache_key(cv.pk, _cv_version(cv), template_slug, print_compact)
+    body = cache.get(key)
+    if body is None:
+        body = render_to_string(f'cv/body_{template_slug}.html', {
+            'cv': cv,
+            'print_compact': print_compact,
+        })
+        cache.set(key, str(body), settings.CV_PREVIEW_CACHE_TIMEOUT)
+    return mark_safe(body)
+
+
+def invalidate_cv_body(cv):
+    """Drop every cached body variant for the version of ``cv`` currently in memory."""
+    if cv.pk is None:
+        return
+    version = _cv_version(cv)
+    cache.delete_many([
+        _body_cache_key(cv.pk, version, slug, compact)
+        for slug in PREVIEW_TEMPLATE_SLUGS
+        for compact in (False, True)
+    ])
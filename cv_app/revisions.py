@@ -0,0 +1,210 @@
+"""Revision history for CVs, stored as compressed deltas.
+
+Every save that changes a CV's content appends a ``CVRevision``. A revision
+holds the zlib-compressed JSON of either the full tracked state (a snapshot,
+``depth == 0``) or a delta against the previous revision. A snapshot is
+written every ``CV_REVISION_SNAPSHOT_EVERY`` revisions, so rebuilding any
+revision reads one snapshot and at most that many deltas.
+
+Deltas map changed fields to their new value. Section lists are diffed per
+item: ``{"n": <new length>, "set": {"<index>": <item>}}``.
+
+Recording costs one indexed lookup and one insert. The delta is taken
+against the values the CV was loaded with, and is only used when they match
+the latest revision's digest; otherwise a snapshot is written, so writes
+that bypass ``save()`` cannot corrupt the chain.
+"""
+import difflib
+import hashlib
+import json
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import CV, CVRevision
+from .registry import template_registry
+
+TRACKED_FIELDS = (
+    'title', 'template_id', 'full_name', 'job_title', 'email', 'phone', 'location', 'links', 'photo',
+    'summary', 'skills', 'experience', 'education', 'projects',
+)
+SECTION_FIELDS = ('experience', 'education', 'projects')
+SCALAR_FIELDS = tuple(field for field in TRACKED_FIELDS if field not in SECTION_FIELDS)
+
+
+def _normalize(values):
+    state = {field: values.get(field) for field in TRACKED_FIELDS}
+    photo = state['photo']
+    state['photo'] = getattr(photo, 'name', photo) or ''
+    for field in SECTION_FIELDS:
+        state[field] = state[field] or []
+    return state
+
+
+def cv_state(cv):
+    """The tracked fields of ``cv`` as a JSON-serializable dict."""
+    if cv.get_deferred_fields().intersection(SCALAR_FIELDS):
+        values = CV.objects.filter(pk=cv.pk).values(*SCALAR_FIELDS).get()
+    else:
+        values = {field: getattr(cv, field) for field in SCALAR_FIELDS}
+    # Sections are properties backed by the shared content row
+    values.update({field: getattr(cv, field) for field in SECTION_FIELDS})
+    return _normalize(values)
+
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def state_digest(state):
+    return hashlib.sha1(_dumps(state).encode()).hexdigest()
+
+
+def encode(payload):
+    return zlib.compress(_dumps(payload).encode(), 6)
+
+
+def decode(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def make_delta(before, after):
+    delta = {}
+    for field in TRACKED_FIELDS:
+        old, new = before[field], after[field]
+        if old == new:
+            continue
+        if field in SECTION_FIELDS:
+            changed = {str(i): item for i, item in enumerate(new) if i >= len(old) or old[i] != item}
+            delta[field] = {'n': len(new), 'set': changed}
+        else:
+            delta[field] = new
+    return delta
+
+
+def apply_delta(state, delta):
+    state = dict(state)
+    for field, value in delta.items():
+        if field in SECTION_FIELDS:
+            items = list(state[field][:value['n']])
+            items.extend([None] * (value['n'] - len(items)))
+            for index, item in value['set'].items():
+                items[int(index)] = item
+            state[field] = items
+        else:
+            state[field] = value
+    return state
+
+
+def record_revision(cv):
+    """Append a revision for ``cv`` if its content changed since the latest one."""
+    state = cv_state(cv)
+    digest = state_digest(state)
+    latest = (
+        CVRevision.objects.filter(cv_id=cv.pk)
+        .order_by('-number').values('number', 'digest', 'depth').first()
+    )
+    if latest is not None and latest['digest'] == digest:
+        return None
+
+    loaded = getattr(cv, '_loaded_values', None)
+    base = _normalize(loaded) if loaded is not None and set(TRACKED_FIELDS) <= loaded.keys() else None
+    if (latest is not None and base is not None
+            and latest['depth'] + 1 < settings.CV_REVISION_SNAPSHOT_EVERY
+            and state_digest(base) == latest['digest']):
+        payload, depth = make_delta(base, state), latest['depth'] + 1
+    else:
+        payload, depth = state, 0
+
+    revision = CVRevision.objects.create(
+        cv_id=cv.pk,
+        number=latest['number'] + 1 if latest else 1,
+        depth=depth,
+        digest=digest,
+        data=encode(payload),
+    )
+    # Further saves of this instance are diffed against what was just recorded
+    cv._loaded_values = dict(state)
+    return revision
+
+
+def load_state(cv_id, number):
+    """Rebuild the tracked state of revision ``number`` from its snapshot and deltas."""
+    depth = CVRevision.objects.filter(cv_id=cv_id, number=number).values_list('depth', flat=True).get()
+    rows = (
+        CVRevision.objects.filter(cv_id=cv_id, number__lte=number)
+        .order_by('-number').values_list('depth', 'data')[:depth + 1]
+    )
+    state = None
+    for row_depth, data in reversed(list(rows)):
+        payload = decode(data)
+        state = payload if row_depth == 0 or state is None else apply_delta(state, payload)
+    return state
+
+
+def compact_history(cv_id, keep):
+    """Drop the revisions of ``cv_id`` for which ``keep(revision)`` is false and re-chain the rest.
+
+    The latest revision is always kept. Returns the number of revisions deleted.
+    """
+    revisions = list(CVRevision.objects.filter(cv_id=cv_id).order_by('number'))
+    if not revisions:
+        return 0
+    kept = []
+    state = None
+    for index, revision in enumerate(revisions):
+        payload = decode(revision.data)
+        state = payload if revision.depth == 0 or state is None else apply_delta(state, payload)
+        if index == len(revisions) - 1 or keep(revision):
+            kept.append((revision, state))
+    if len(kept) == len(revisions):
+        return 0
+
+    previous = previous_state = None
+    for revision, revision_state in kept:
+        if previous is None or previous.depth + 1 >= settings.CV_REVISION_SNAPSHOT_EVERY:
+            revision.data, revision.depth = encode(revision_state), 0
+        else:
+            revision.data = encode(make_delta(previous_state, revision_state))
+            revision.depth = previous.depth + 1
+        previous, previous_state = revision, revision_state
+
+    kept_ids = [revision.pk for revision, _ in kept]
+    with transaction.atomic():
+        deleted, _ = CVRevision.objects.filter(cv_id=cv_id).exclude(pk__in=kept_ids).delete()
+        CVRevision.objects.bulk_update([revision for revision, _ in kept], ['data', 'depth'], batch_size=500)
+    return deleted
+
+
+def _field_lines(field, value):
+    if field in SECTION_FIELDS:
+        lines = []
+        for index, item in enumerate(value or [], start=1):
+            lines.append(f'#{index}')
+            for key, item_value in (item or {}).items():
+                if isinstance(item_value, list):
+                    lines.extend(f'  {key}: {entry}' for entry in item_value)
+                elif item_value:
+                    lines.append(f'  {key}: {item_value}')
+        return lines
+    if field == 'template_id':
+        tmpl = template_registry.get_by_id(value)
+        return [tmpl.name] if tmpl else []
+    return str(value if value is not None else '').splitlines()
+
+
+def diff_states(before, after):
+    """Per-field unified diffs between two states, as ``[(field, [(tag, line), ...]), ...]``.
+
+    ``tag`` is '+', '-', ' ' or '@' (hunk header). Unchanged fields are left out.
+    """
+    before = before or {field: None for field in TRACKED_FIELDS}
+    changes = []
+    for field in TRACKED_FIELDS:
+        if before.get(field) == after.get(field):
+            continue
+        lines = difflib.unified_diff(
+            _field_lines(field, before.get(field)), _field_lines(field, after.get(field)), lineterm='', n=2)
+        changes.append((field, [(line[:1], line[1:]) for line in list(lines)[2:]]))
+    return changes
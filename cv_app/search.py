@@ -0,0 +1,115 @@
+"""Full-text search over CVs.
+
+``CV.search_text`` holds the searchable text of a CV and is refreshed on
+every save. The database indexes it natively:
+
+* PostgreSQL: a generated ``search_vector`` tsvector column with a GIN index.
+* SQLite: an FTS5 external-content table kept in sync by triggers.
+* Anything else: a plain ``icontains`` scan.
+
+``ensure_search_schema`` creates those objects. It runs from the migration
+and again after every ``migrate``, because SQLite table rebuilds drop
+triggers.
+"""
+import re
+
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Model fields the text is built from; the section lists live behind ``content``
+SEARCH_SOURCE_FIELDS = frozenset({'title', 'full_name', 'job_title', 'summary', 'skills', 'content'})
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+def _flatten(value):
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _flatten(item)
+    elif value:
+        yield str(value)
+
+
+def build_search_text(cv):
+    parts = [cv.title, cv.full_name, cv.job_title, cv.summary, cv.skills]
+    for field in ('experience', 'education', 'projects'):
+        parts.extend(_flatten(getattr(cv, field)))
+    return '\n'.join(p for p in parts if p)
+
+
+def search_q(query, using='default'):
+    """Return a Q matching CVs whose text contains every word of ``query`` (as prefixes)."""
+    from django.db import connections
+
+    tokens = _TOKEN.findall(query or '')
+    if not tokens:
+        return Q()
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{t}:*' for t in tokens)
+        return Q(id__in=RawSQL(
+            "SELECT id FROM cv_app_cv WHERE search_vector @@ to_tsquery('simple', %s)", [tsquery]))
+    if vendor == 'sqlite':
+        match = ' '.join('"{}"*'.format(t.replace('"', '')) for t in tokens)
+        return Q(id__in=RawSQL(
+            'SELECT rowid FROM cv_app_cv_fts WHERE cv_app_cv_fts MATCH %s', [match]))
+    q = Q()
+    for token in tokens:
+        q &= Q(search_text__icontains=token)
+    return q
+
+
+_SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS cv_app_cv_fts USING fts5("
+    "search_text, content='cv_app_cv', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS cv_app_cv_fts_ai AFTER INSERT ON cv_app_cv BEGIN "
+    "INSERT INTO cv_app_cv_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS cv_app_cv_fts_ad AFTER DELETE ON cv_app_cv BEGIN "
+    "INSERT INTO cv_app_cv_fts(cv_app_cv_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS cv_app_cv_fts_au AFTER UPDATE OF search_text ON cv_app_cv BEGIN "
+    "INSERT INTO cv_app_cv_fts(cv_app_cv_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO cv_app_cv_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+]
+
+_POSTGRES_SCHEMA = [
+    "ALTER TABLE cv_app_cv ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(search_text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS cv_app_cv_search_vector_gin ON cv_app_cv USING GIN (search_vector)",
+]
+
+
+def ensure_search_schema(connection):
+    """Create the vendor-specific search objects if they are missing."""
+    if 'cv_app_cv' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        # Databases migrated only to before 0008 have no search column yet
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, 'cv_app_cv')}
+        if 'search_text' not in columns:
+            return
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'cv_app_cv_fts_%'")
+            in_sync = cursor.fetchone()[0] == 3
+            for statement in _SQLITE_SCHEMA:
+                cursor.execute(statement)
+            if not in_sync:
+                # Triggers were (re)created, so rows may have changed without them
+                cursor.execute("INSERT INTO cv_app_cv_fts(cv_app_cv_fts) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            for statement in _POSTGRES_SCHEMA:
+                cursor.execute(statement)
+
+
+def drop_search_schema(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS cv_app_cv_fts_{name}')
+            cursor.execute('DROP TABLE IF EXISTS cv_app_cv_fts')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS cv_app_cv_search_vector_gin')
+            cursor.execute('ALTER TABLE cv_app_cv DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,143 @@
+"""Conversion between the editor formsets and the stored CV section lists.
+
+The formset classes are built once at import time and shared by the
+create and edit views.
+"""
+from django.core.exceptions import ValidationError
+from django.forms import formset_factory
+
+from .forms import EducationItemForm, ExperienceItemForm, ProjectItemForm
+
+ExperienceFormSet = formset_factory(ExperienceItemForm, extra=1, can_delete=True)
+EducationFormSet = formset_factory(EducationItemForm, extra=1, can_delete=True)
+ProjectFormSet = formset_factory(ProjectItemForm, extra=1, can_delete=True)
+
+EXPERIENCE_KEYS = ('company', 'position', 'duration', 'website', 'responsibilities', 'description')
+EDUCATION_KEYS = ('institution', 'degree', 'duration', 'status')
+PROJECT_KEYS = ('name', 'description', 'technologies', 'status')
+
+
+def _strip(cd, key):
+    return (cd.get(key) or '').strip()
+
+
+def encode_experience(cd):
+    if not any(cd.get(k) for k in EXPERIENCE_KEYS):
+        return None
+    item = {k: _strip(cd, k) for k in EXPERIENCE_KEYS}
+    # responsibilities are edited one per line and stored as a list
+    item['responsibilities'] = [ln.strip() for ln in item['responsibilities'].splitlines() if ln.strip()]
+    return item
+
+
+def encode_education(cd):
+    item = {k: _strip(cd, k) for k in EDUCATION_KEYS}
+    return item if any(item.values()) else None
+
+
+def encode_project(cd):
+    item = {k: _strip(cd, k) for k in PROJECT_KEYS}
+    return item if any(item.values()) else None
+
+
+def decode_experience(item):
+    responsibilities = item.get('responsibilities', [])
+    if not isinstance(responsibilities, list):
+        responsibilities = [responsibilities or '']
+    return {
+        'company': item.get('company', ''),
+        'position': item.get('position', ''),
+        'duration': item.get('duration', ''),
+        'website': item.get('website', ''),
+        'responsibilities': '\n'.join(responsibilities).strip(),
+        'description': item.get('description', ''),
+    }
+
+
+def decode_education(item):
+    return {
+        'institution': item.get('institution', ''),
+        'degree': item.get('degree', ''),
+        'duration': item.get('duration', item.get('year', '')),
+        'status': item.get('status', ''),
+    }
+
+
+def decode_project(item):
+    return {k: item.get(k, '') for k in PROJECT_KEYS}
+
+
+# model field -> (formset class, form prefix, template context name, encoder, decoder)
+SECTIONS = {
+    'experience': (ExperienceFormSet, 'exp', 'exp_formset', encode_experience, decode_experience),
+    'education': (EducationFormSet, 'edu', 'edu_formset', encode_education, decode_education),
+    'projects': (ProjectFormSet, 'proj', 'proj_formset', encode_project, decode_project),
+}
+
+
+def bind_formsets(data=None):
+    """Return the three section formsets keyed by their template context name."""
+    return {
+        context_name: formset_class(data, prefix=prefix)
+        for formset_class, prefix, context_name, _, _ in SECTIONS.values()
+    }
+
+
+def initial_formsets(cv):
+    """Unbound formsets pre-filled from the sections stored on ``cv``."""
+    stored = {
+        'experience': cv.get_experience_list(),
+        'education': cv.get_education_list(),
+        'projects': cv.get_projects_list(),
+    }
+    formsets = {}
+    for field, (formset_class, prefix, context_name, _, decode) in SECTIONS.items():
+        initial = [decode(item) for item in stored[field] if isinstance(item, dict)]
+        formsets[context_name] = formset_class(initial=initial or [{}], prefix=prefix)
+    return formsets
+
+
+def encode_formsets(formsets):
+    """Turn validated formsets into ``{model field: list of items}``, skipping blank and deleted rows."""
+    sections = {}
+    for field, (_, _, context_name, encode, _) in SECTIONS.items():
+        items = []
+        for form in formsets[context_name].forms:
+            cd = getattr(form, 'cleaned_data', None)
+            if not cd or cd.get('DELETE'):
+                continue
+            item = encode(cd)
+            if item is not None:
+                items.append(item)
+        sections[field] = items
+    return sections
+
+
+def clean_item(field, item):
+    """Validate one stored-format item for ``field``; return it normalized, or None when blank."""
+    formset_class, _, _, encode, decode = SECTIONS[field]
+    if not isinstance(item, dict):
+        raise ValidationError('must be an object')
+    form = formset_class.form(data=decode(item))
+    if not form.is_valid():
+        raise ValidationError('; '.join(f'{name}: {" ".join(msgs)}' for name, msgs in form.errors.items()))
+    return encode(form.cleaned_data)
+
+
+def clean_items(field, items):
+    """Validate stored-format ``items`` for ``field`` with the editor's item form.
+
+    Returns the normalized list, dropping blank items, or raises
+    ValidationError naming the first offending item.
+    """
+    if not isinstance(items, list):
+        raise ValidationError(f'{field} must be a list')
+    cleaned = []
+    for index, item in enumerate(items):
+        try:
+            encoded = clean_item(field, item)
+        except ValidationError as exc:
+            raise ValidationError(f'{field}[{index}]: {"; ".join(exc.messages)}')
+        if encoded is not None:
+            cleaned.append(encoded)
+    return cleaned
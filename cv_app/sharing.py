@@ -0,0 +1,134 @@
+"""Public, read-only CV links served from pre-rendered snapshots.
+
+Publishing a CV gives it an unguessable ``share_token`` and writes a
+self-contained HTML file, ``<CV_SHARE_ROOT>/<token>.html``: the body for the
+CV's template, with its CSS bundle inlined and its photo embedded as a data
+URI. The file is rewritten after every save that changes the CV's content
+(see ``cv_app.signals``) and removed when the CV is unpublished or deleted.
+
+``SharedSnapshotMiddleware`` serves the files at ``CV_SHARE_URL`` ahead of
+sessions, authentication and URL routing, so public hits never reach a view
+or the database. A web server can serve the directory directly instead.
+"""
+import base64
+import mimetypes
+import os
+import re
+import secrets
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotAllowed, HttpResponseNotFound, HttpResponseNotModified
+from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .assets import bundle_css
+from .images import variant_names
+from .registry import template_registry
+from .rendering import PREVIEW_TEMPLATE_SLUGS, render_cv_body
+
+TOKEN_BYTES = 24
+SNAPSHOT_NAME = re.compile(r'[A-Za-z0-9_-]{32}\.html')
+
+
+def snapshot_path(token):
+    return Path(settings.CV_SHARE_ROOT) / f'{token}.html'
+
+
+def snapshot_url(token):
+    return f'{settings.CV_SHARE_URL}{token}.html'
+
+
+def _embed_photos(cv, body):
+    # Swap the photo URLs the body uses for data URIs of the same files
+    if not cv.photo:
+        return body
+    storage = cv.photo.storage
+    names = variant_names(cv.photo.name) or {'original': cv.photo.name}
+    for name in names.values():
+        url = escape(storage.url(name))
+        if url not in body:
+            continue
+        try:
+            with storage.open(name) as fh:
+                data = base64.b64encode(fh.read()).decode('ascii')
+        except OSError:
+            continue
+        mime = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        body = body.replace(url, f'data:{mime};base64,{data}')
+    return body
+
+
+def render_snapshot(cv):
+    tmpl = template_registry.get_by_id(cv.template_id)
+    slug = tmpl.slug if tmpl and tmpl.slug in PREVIEW_TEMPLATE_SLUGS else PREVIEW_TEMPLATE_SLUGS[0]
+    return render_to_string('cv/snapshot.html', {
+        'cv': cv,
+        'css': mark_safe(bundle_css(slug)),
+        'cv_body': mark_safe(_embed_photos(cv, str(render_cv_body(cv, slug)))),
+    })
+
+
+def write_snapshot(cv):
+    """(Re)write the snapshot of a published ``cv``, replacing the old file atomically."""
+    path = snapshot_path(cv.share_token)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    with os.fdopen(fd, 'w', encoding='utf-8') as fh:
+        fh.write(render_snapshot(cv))
+    os.replace(tmp, path)
+
+
+def delete_snapshot(token):
+    if token:
+        snapshot_path(token).unlink(missing_ok=True)
+
+
+def publish(cv):
+    if not cv.share_token:
+        cv.share_token = secrets.token_urlsafe(TOKEN_BYTES)
+        cv.save(update_fields=['share_token'])
+    write_snapshot(cv)
+
+
+def unpublish(cv):
+    """Remove the snapshot; publishing again issues a new link."""
+    delete_snapshot(cv.share_token)
+    cv.share_token = None
+    cv.save(update_fields=['share_token'])
+
+
+class SharedSnapshotMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.CV_SHARE_URL
+        self.root = Path(settings.CV_SHARE_ROOT)
+        self.cache_control = f'public, max-age={settings.CV_SHARE_MAX_AGE}'
+
+    def __call__(self, request):
+        if not request.path_info.startswith(self.prefix):
+            return self.get_response(request)
+        name = request.path_info[len(self.prefix):]
+        if not SNAPSHOT_NAME.fullmatch(name):
+            return HttpResponseNotFound()
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        path = self.root / name
+        try:
+            stat = path.stat()
+        except OSError:
+            return HttpResponseNotFound()
+
+        # Snapshots keep their URL when rewritten, so caches revalidate by ETag
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(path.open('rb'), content_type='text/html; charset=utf-8')
+        response['ETag'] = etag
+        response['Cache-Control'] = self.cache_control
+        response['X-Robots-Tag'] = 'noindex'
+        response['Referrer-Policy'] = 'no-referrer'
+        return response
@@ -0,0 +1,46 @@
+from functools import partial
+
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import CV, CVTemplate
+from .pdf import delete_pdfs
+from .registry import template_registry
+from .rendering import invalidate_cv_body
+from .revisions import record_revision
+from .search import ensure_search_schema
+from .sharing import delete_snapshot, write_snapshot
+
+
+@receiver(pre_save, sender=CV)
+def cv_pre_save(sender, instance, **kwargs):
+    # updated_at still holds the version being replaced at this point.
+    invalidate_cv_body(instance)
+
+
+@receiver(post_save, sender=CV)
+def cv_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # A new revision means the content changed, so a published snapshot is stale
+    if record_revision(instance) is not None and instance.share_token:
+        transaction.on_commit(partial(write_snapshot, instance))
+
+
+@receiver(post_delete, sender=CV)
+def cv_post_delete(sender, instance, **kwargs):
+    invalidate_cv_body(instance)
+    delete_pdfs(instance.pk)
+    delete_snapshot(instance.share_token)
+
+
+@receiver(post_save, sender=CVTemplate)
+@receiver(post_delete, sender=CVTemplate)
+def cv_template_changed(sender, **kwargs):
+    template_registry.invalidate()
+
+
+def ensure_search_index(sender, using, **kwargs):
+    # SQLite rebuilds tables on many schema changes, dropping the FTS triggers
+    ensure_search_schema(connections[using])
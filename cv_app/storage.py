@@ -0,0 +1,60 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+DIGEST_LENGTH = 20
+# <digest>.<ext> or <digest>-<variant>.<ext>
+ADDRESSED_NAME = re.compile(rf'^(?P<digest>[0-9a-f]{{{DIGEST_LENGTH}}})(?:-[a-z]+)?\.[a-z0-9]+$')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that keeps each distinct file once, named by its SHA-256.
+
+    Saving content that is already stored returns the existing name instead
+    of writing a copy. The name is always derived from the content, whatever
+    name the upload came with; only ``save_addressed`` (used by
+    ``process_photo`` for variants that share their source's digest) trusts
+    the caller's name. Files are never removed when a CV changes;
+    ``manage.py gc_photos`` deletes unreferenced ones.
+    """
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        dirname, basename = posixpath.split(name)
+        ext = posixpath.splitext(basename)[1].lower()
+        return posixpath.join(dirname, digest.hexdigest()[:DIGEST_LENGTH] + ext)
+
+    def _reuse(self, name):
+        if not self.exists(name):
+            return False
+        # A fresh mtime keeps gc_photos' --min-age grace from expiring under a new reference
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        name = self.content_name(name.replace('\\', '/'), content)
+        if self._reuse(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def save_addressed(self, name, content):
+        """Store ``content`` under ``name``, which the caller derived from a content digest."""
+        if not ADDRESSED_NAME.match(posixpath.basename(name)):
+            raise ValueError(f'{name!r} is not a content-addressed name')
+        if self._reuse(name):
+            return name
+        return super().save(name, content)
+
+
+def photo_storage():
+    return ContentAddressedStorage()
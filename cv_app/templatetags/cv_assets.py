@@ -0,0 +1,40 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from ..assets import BASE_CSS, bundle_path, inline_css, load_manifest, template_css_path
+
+register = template.Library()
+
+# Cards show previews at most this wide; srcset picks the 2x variant on dense screens
+PREVIEW_SIZES = '(max-width: 600px) 90vw, 256px'
+
+
+@register.simple_tag
+def template_css(slug):
+    """Stylesheets for a preview page: the inlined bundle, a link to it, or the unbundled sources."""
+    css = inline_css(slug)
+    if css is not None:
+        # Bundles are built from our own static files; '</' cannot close the style element
+        return format_html('<style>{}</style>', mark_safe(css.replace('</', '<\\/')))
+    if slug in load_manifest().get('css', {}):
+        return format_html('<link rel="stylesheet" href="{}">', static(bundle_path(slug)))
+    return format_html(
+        '<link rel="stylesheet" href="{}">\n<link rel="stylesheet" href="{}">',
+        static(BASE_CSS), static(template_css_path(slug)),
+    )
+
+
+@register.simple_tag
+def preview_picture(path, alt):
+    """A template preview image with WebP sources when ``build_assets`` has produced them."""
+    entry = load_manifest().get('images', {}).get(path)
+    if not entry:
+        return format_html('<img src="{}" alt="{}" loading="lazy" decoding="async">', static(path), alt)
+    srcset = format_html_join(', ', '{} {}w', ((static(v['path']), v['width']) for v in entry['webp']))
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" alt="{}" width="{}" height="{}" loading="lazy" decoding="async"></picture>',
+        srcset, PREVIEW_SIZES, static(path), alt, entry['width'], entry['height'],
+    )
@@ -1,3 +1,1105 @@
-from django.test import TestCase
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from django.test import (
+    AsyncClient, Client, TestCase, TransactionTestCase, modify_settings, override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from PIL import Image
+
+from accounts.views import aprofile
+from cv_builder import profiling
+from cv_builder.db.pool import ConnectionPool, PoolTimeout
+from cv_builder.urls import urlpatterns as project_urlpatterns
+
+from . import assets, pdf, prewarm, rendering, sharing, views
+from .forms import CVForm
+from .images import variant_names
+from .models import CV, CVContent, CVRevision, CVTemplate, RequestTimingSummary
+from .pdf import pdf_path
+from .rendering import template_source_signature
+from .revisions import cv_state, load_state
+from .sections import (
+    bind_formsets, clean_items, decode_education, encode_education, encode_experience, encode_formsets,
+    initial_formsets,
+)
+from .transfer import import_lines
+from .templatetags.cv_assets import template_css
+from .registry import template_registry
+
+
+# The manifest storage needs collectstatic; tests render templates without it.
+plain_static = override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+)
+
+
+@plain_static
+class DashboardQueryTests(TestCase):
+    # session, user, ETag aggregate (which also supplies the page count), CV page
+    MAX_QUERIES = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        templates = [
+            CVTemplate.objects.create(slug=slug, name=slug.title())
+            for slug in ('classic', 'modern', 'minimal', 'advanced')
+        ]
+        CV.objects.bulk_create([
+            CV(owner=cls.user, title=f'CV {i}', full_name='Jane Doe', email='jane@example.com',
+               template=templates[i % len(templates)])
+            for i in range(30)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_query_count_does_not_grow_with_cvs(self):
+        with self.assertNumQueries(self.MAX_QUERIES):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Modern')
+
+    def test_page_query_is_served_by_owner_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('plan assertions are written against SQLite EXPLAIN QUERY PLAN')
+        response = self.client.get(reverse('dashboard'))
+        page = response.context['page_obj']
+        plan = page.paginator.object_list[page.start_index() - 1:page.end_index()].explain()
+        self.assertIn('USING INDEX cv_app_cv_owner_updated_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_paginates(self):
+        response = self.client.get(reverse('dashboard'), {'page': 2})
+        self.assertEqual(len(response.context['cvs']), 10)
+        self.assertTrue(response.context['page_obj'].has_previous())
+
+
+@plain_static
+@override_settings(
+    AUTHENTICATION_BACKENDS=['accounts.backends.CachedModelBackend'], CV_USER_CACHE_TTL=60,
+)
+class SessionModeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        CV.objects.create(owner=cls.user, title='CV', full_name='Jane Doe', email='jane@example.com')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_session_and_user_lookups_skip_the_database(self):
+        for engine in ('django.contrib.sessions.backends.signed_cookies',
+                       'django.contrib.sessions.backends.cached_db'):
+            with self.subTest(engine=engine), self.settings(SESSION_ENGINE=engine):
+                client = Client()
+                client.force_login(self.user)
+                client.get(reverse('dashboard'))
+                # ETag aggregate and CV page only
+                with self.assertNumQueries(2):
+                    response = client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH='"stale"')
+                self.assertEqual(response.status_code, 200)
+
+    def test_password_change_signs_out_cached_sessions(self):
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            self.client.force_login(self.user)
+            self.assertEqual(self.client.get(reverse('dashboard')).status_code, 200)
+            self.user.set_password('new-password')
+            self.user.save()
+            self.assertRedirects(self.client.get(reverse('dashboard')),
+                                 f"{reverse('login')}?next={reverse('dashboard')}")
+
+
+class TemplateRegistryTests(TestCase):
+    def test_lookups_are_served_from_memory(self):
+        CVTemplate.objects.create(slug='classic', name='Classic')
+        template_registry.invalidate()
+        template_registry.active()
+        with self.assertNumQueries(0):
+            self.assertEqual(template_registry.get_by_slug('classic').name, 'Classic')
+            self.assertEqual([t.slug for t in template_registry.active()], ['classic'])
+
+    def test_reloads_after_save(self):
+        tmpl = CVTemplate.objects.create(slug='classic', name='Classic')
+        template_registry.active()
+        tmpl.active = False
+        tmpl.save()
+        self.assertIsNone(template_registry.get_by_slug('classic'))
+        self.assertEqual(template_registry.get_by_id(tmpl.pk).slug, 'classic')
+
+
+@plain_static
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='classic', name='Classic')
+        cls.cv = CV.objects.create(owner=cls.user, title='CV', full_name='Jane Doe',
+                                   email='jane@example.com', template=cls.template)
+
+    def setUp(self):
+        template_registry.invalidate()
+        self.client.force_login(self.user)
+        self.url = reverse('cv_preview', args=[self.cv.pk])
+
+    def test_preview_returns_304_until_cv_changes(self):
+        # The first response sets the CSRF cookie, which is part of the ETag
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        # session, user, etag lookup
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.cv.title = 'Renamed'
+        self.cv.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_template_and_compact_flag(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'compact': '1'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_dashboard_changes_when_cv_deleted(self):
+        url = reverse('dashboard')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        CV.objects.filter(pk=self.cv.pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class BodyCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.cv = CV.objects.create(owner=cls.user, title='CV', full_name='Jane Doe', email='jane@example.com')
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(rendering, 'render_to_string', wraps=rendering.render_to_string)
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def keys(self, cv):
+        version = rendering._cv_version(cv)
+        return [rendering._body_cache_key(cv.pk, version, 'classic', compact) for compact in (False, True)]
+
+    def test_second_render_is_served_from_cache(self):
+        first = rendering.render_cv_body(self.cv, 'classic')
+        self.assertIn('Jane Doe', first)
+        self.assertEqual(rendering.render_cv_body(self.cv, 'classic'), first)
+        self.assertEqual(self.render.call_count, 1)
+
+    def test_slug_and_compact_are_cached_separately(self):
+        variants = [('classic', False), ('classic', True), ('modern', False)]
+        for slug, compact in variants * 2:
+            rendering.render_cv_body(self.cv, slug, compact)
+        self.assertEqual(self.render.call_count, 3)
+        self.assertEqual(len({rendering._body_cache_key(self.cv.pk, 1, slug, compact)
+                              for slug, compact in variants}), 3)
+
+    def test_save_drops_the_cached_body(self):
+        cv = CV.objects.get(pk=self.cv.pk)
+        rendering.render_cv_body(cv, 'classic')
+        rendering.render_cv_body(cv, 'classic', True)
+        stale = self.keys(cv)
+        self.assertTrue(all(cache.get(key) for key in stale))
+
+        cv.full_name = 'Jane Smith'
+        cv.save()
+        self.assertEqual(cache.get_many(stale), {})
+        body = rendering.render_cv_body(cv, 'classic')
+        self.assertIn('Jane Smith', body)
+        self.assertNotIn('Jane Doe', body)
+
+    def test_delete_drops_the_cached_body(self):
+        cv = CV.objects.get(pk=self.cv.pk)
+        rendering.render_cv_body(cv, 'classic')
+        stale = self.keys(cv)
+        cv.delete()
+        self.assertEqual(cache.get_many(stale), {})
+
+
+@plain_static
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.python = CV.objects.create(owner=cls.user, title='Backend', full_name='Jane Doe',
+                                       email='jane@example.com',
+                                       experience=[{'company': 'Acme', 'position': 'Python developer'}])
+        CV.objects.create(owner=cls.user, title='Design', full_name='Jane Doe', email='jane@example.com')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_dashboard_matches_section_text_by_prefix(self):
+        response = self.client.get(reverse('dashboard'), {'q': 'pyth acme'})
+        self.assertEqual([cv.pk for cv in response.context['cvs']], [self.python.pk])
+
+    def test_index_follows_edits(self):
+        self.python.experience = []
+        self.python.save()
+        response = self.client.get(reverse('dashboard'), {'q': 'python'})
+        self.assertEqual(len(response.context['cvs']), 0)
+
+
+# The project urlconf with the async views in front, as CV_ASYNC_VIEWS routes them
+urlpatterns = [
+    path('dashboard/', views.adashboard, name='dashboard'),
+    path('cv/<int:cv_id>/preview/', views.acv_preview, name='cv_preview'),
+    path('accounts/profile/', aprofile, name='profile'),
+] + project_urlpatterns
+
+
+@plain_static
+@override_settings(ROOT_URLCONF='cv_app.tests')
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.other = User.objects.create_user('other', password='pw')
+        cls.template = CVTemplate.objects.create(slug='classic', name='Classic')
+        cls.cv = CV.objects.create(owner=cls.user, title='Async CV', full_name='Jane Doe',
+                                   email='jane@example.com', template=cls.template)
+
+    def setUp(self):
+        template_registry.invalidate()
+        self.async_client.force_login(self.user)
+
+    async def test_dashboard_and_conditional_get(self):
+        url = reverse('dashboard')
+        await self.async_client.get(url)
+        response = await self.async_client.get(url)
+        self.assertContains(response, 'Async CV')
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('private', response['Cache-Control'])
+
+    async def test_preview_is_owner_only(self):
+        response = await self.async_client.get(reverse('cv_preview', args=[self.cv.pk]))
+        self.assertContains(response, 'Jane Doe')
+        other_cv = await CV.objects.acreate(owner=self.other, title='Other', full_name='X',
+                                            email='x@example.com', template=self.template)
+        response = await self.async_client.get(reverse('cv_preview', args=[other_cv.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_profile_counts_cvs(self):
+        response = await self.async_client.get(reverse('profile'))
+        self.assertContains(response, 'Number of CVs:</strong> 1')
+
+    async def test_anonymous_is_redirected_to_login(self):
+        response = await AsyncClient().get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+@plain_static
+class AssetBuildTests(TestCase):
+    def setUp(self):
+        self.build_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.build_dir.cleanup)
+        settings_override = override_settings(CV_ASSET_BUILD_DIR=Path(self.build_dir.name))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        for fn in (assets.load_manifest, assets.inline_css):
+            fn.cache_clear()
+            self.addCleanup(fn.cache_clear)
+
+    def test_minify_keeps_strings(self):
+        css = "/* note */\n.a > .b ,.c {\n  content: ' |  x ';\n  color: red;\n}\n"
+        self.assertEqual(assets.minify_css(css), ".a>.b,.c{content:' |  x ';color:red}")
+
+    def test_template_css_links_sources_until_built(self):
+        self.assertIn('css/templates/modern.css', template_css('modern'))
+        out_dir = Path(self.build_dir.name)
+        assets.write_manifest(out_dir, {'css': assets.build_css(out_dir, ['modern'])})
+        inlined = template_css('modern')
+        self.assertTrue(inlined.startswith('<style>'))
+        self.assertNotIn('<link', inlined)
+        with override_settings(CV_INLINE_CSS_MAX_BYTES=10):
+            assets.inline_css.cache_clear()
+            self.assertIn('css/bundles/modern.css', template_css('modern'))
+
+
+class AutosaveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='classic', name='Classic')
+        cls.cv = CV.objects.create(
+            owner=cls.user, title='CV', full_name='Jane Doe', email='jane@example.com', template=cls.template,
+            education=[{'institution': 'Uni', 'degree': 'BSc', 'duration': '', 'status': ''}],
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('cv_autosave', args=[self.cv.pk])
+
+    def patch(self, body):
+        return self.client.patch(self.url, json.dumps(body), content_type='application/json')
+
+    def test_applies_field_and_item_diffs(self):
+        self.cv.refresh_from_db()
+        response = self.patch({
+            'version': self.cv.updated_at.isoformat(),
+            'fields': {'summary': 'Backend developer'},
+            'sections': {'education': [
+                {'op': 'replace', 'index': 0, 'item': {'institution': 'Uni', 'degree': 'MSc'}},
+                {'op': 'insert', 'index': 1, 'item': {'institution': 'School'}},
+            ]},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.cv.refresh_from_db()
+        self.assertEqual(response.json()['version'], self.cv.updated_at.isoformat())
+        self.assertEqual(self.cv.summary, 'Backend developer')
+        self.assertEqual([e['degree'] for e in self.cv.education], ['MSc', ''])
+
+    def test_stale_version_is_refused(self):
+        response = self.patch({'version': '2000-01-01T00:00:00+00:00', 'fields': {'summary': 'x'}})
+        self.assertEqual(response.status_code, 409)
+        self.cv.refresh_from_db()
+        self.assertEqual(self.cv.summary, '')
+
+    def test_invalid_patch_changes_nothing(self):
+        self.cv.refresh_from_db()
+        response = self.patch({
+            'version': self.cv.updated_at.isoformat(),
+            'fields': {'summary': 'x', 'email': 'not an email'},
+            'sections': {'education': [{'op': 'remove', 'index': 5}]},
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.json()['messages']), 2)
+        self.cv.refresh_from_db()
+        self.assertEqual(self.cv.summary, '')
+
+
+@plain_static
+@override_settings(CV_REVISION_SNAPSHOT_EVERY=3)
+class RevisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='classic', name='Classic')
+
+    def make_history(self, saves):
+        cv = CV.objects.create(owner=self.user, title='CV', full_name='Jane Doe', email='jane@example.com',
+                               template=self.template)
+        states = [cv_state(cv)]
+        for i in range(saves):
+            cv = CV.objects.get(pk=cv.pk)
+            cv.summary = f'Summary {i}'
+            cv.experience = cv.experience + [{'company': f'Company {i}'}]
+            cv.save()
+            states.append(cv_state(cv))
+        return cv, states
+
+    def test_deltas_rebuild_every_revision(self):
+        cv, states = self.make_history(6)
+        depths = list(cv.revisions.order_by('number').values_list('depth', flat=True))
+        self.assertEqual(depths, [0, 1, 2, 0, 1, 2, 0])
+        for number, state in enumerate(states, start=1):
+            self.assertEqual(load_state(cv.pk, number), state)
+
+    def test_write_outside_save_starts_a_snapshot(self):
+        cv, _ = self.make_history(1)
+        CV.objects.filter(pk=cv.pk).update(title='Renamed elsewhere')
+        cv = CV.objects.get(pk=cv.pk)
+        cv.summary = 'Edited'
+        cv.save()
+        latest = cv.revisions.order_by('-number').first()
+        self.assertEqual(latest.depth, 0)
+        self.assertEqual(load_state(cv.pk, latest.number), cv_state(cv))
+
+    def test_compaction_keeps_latest_state_reachable(self):
+        cv, states = self.make_history(6)
+        CVRevision.objects.filter(cv=cv, number__lte=3).update(created_at=timezone.now() - timedelta(days=30))
+        CVRevision.objects.filter(cv=cv, number__in=[4, 5, 6]).update(created_at=timezone.now() - timedelta(days=20))
+        call_command('compact_revisions', keep_last=1, stdout=StringIO())
+        # The last revision of each old day survives, re-chained from a new snapshot
+        rows = cv.revisions.order_by('number').values_list('number', 'depth')
+        self.assertEqual(list(rows), [(3, 0), (6, 1), (7, 2)])
+        for number in (3, 6, 7):
+            self.assertEqual(load_state(cv.pk, number), states[number - 1])
+
+    def test_diff_view(self):
+        cv, _ = self.make_history(2)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('cv_revision', args=[cv.pk, 3]))
+        self.assertContains(response, 'Summary 1')
+        self.assertContains(response, 'Changes since revision #2')
+
+
+class ContentSharingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='classic', name='Classic')
+        cls.other = CVTemplate.objects.create(slug='modern', name='Modern')
+        cls.cv = CV.objects.create(
+            owner=cls.user, title='CV', full_name='Jane Doe', email='jane@example.com', template=cls.template,
+            experience=[{'company': 'Acme', 'position': 'Engineer'}],
+        )
+
+    def save_as_new(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('cv_preview', args=[self.cv.pk]),
+                                    {'action': 'save_as_new', 'template': 'modern'})
+        self.assertEqual(response.status_code, 302)
+        return CV.objects.exclude(pk=self.cv.pk).get()
+
+    def test_copy_shares_content_until_edited(self):
+        copy = self.save_as_new()
+        self.assertEqual(copy.content_id, self.cv.content_id)
+        self.assertEqual(CVContent.objects.count(), 1)
+        self.assertEqual(copy.get_experience_list(), self.cv.get_experience_list())
+
+        copy.experience = copy.experience + [{'company': 'Globex', 'position': 'Lead'}]
+        copy.save()
+        self.assertNotEqual(copy.content_id, self.cv.content_id)
+        self.cv.refresh_from_db()
+        self.assertEqual([e['company'] for e in self.cv.experience], ['Acme'])
+        self.assertEqual([e['company'] for e in CV.objects.get(pk=copy.pk).experience], ['Acme', 'Globex'])
+
+        # Editing back to the original sections finds the original row again
+        copy.experience = [{'company': 'Acme', 'position': 'Engineer'}]
+        copy.save(update_fields=['experience', 'updated_at'])
+        self.assertEqual(copy.content_id, self.cv.content_id)
+        self.assertIn('Acme', CV.objects.get(pk=copy.pk).search_text)
+
+    def test_in_place_edit_is_saved_without_touching_the_shared_row(self):
+        cv = CV.objects.select_related('content').get(pk=self.cv.pk)
+        cv.experience.append({'company': 'Globex', 'position': 'Lead'})
+        self.assertEqual(len(cv.content.experience), 1)
+        cv.save()
+        self.assertNotEqual(cv.content_id, self.cv.content_id)
+        self.assertEqual([e['company'] for e in CV.objects.get(pk=cv.pk).experience], ['Acme', 'Globex'])
+        self.assertEqual(len(CVContent.objects.get(pk=self.cv.content_id).experience), 1)
+
+    def test_gc_removes_unreferenced_contents(self):
+        copy = self.save_as_new()
+        copy.education = [{'institution': 'Uni', 'degree': 'BSc'}]
+        copy.save()
+        copy.delete()
+        self.assertEqual(CVContent.objects.count(), 2)
+        call_command('gc_content', min_age=0, stdout=StringIO())
+        self.assertEqual(list(CVContent.objects.values_list('pk', flat=True)), [self.cv.content_id])
+
+
+class ConnectionPoolTests(TestCase):
+    def connect(self):
+        return sqlite3.connect(':memory:', check_same_thread=False)
+
+    def test_checkouts_wait_for_a_returned_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        first = pool.getconn(self.connect)
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.getconn(self.connect)))
+        waiter.start()
+        waiter.join(0.05)
+        self.assertEqual(got, [])
+        pool.putconn(first)
+        waiter.join()
+        self.assertIs(got[0], first)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['checkouts'], stats['waits']), (1, 2, 1))
+        self.assertGreaterEqual(stats['wait_ms_max'], 40)
+
+        pool.timeout = 0.01
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(self.connect)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_broken_idle_connection_is_replaced(self):
+        pool = ConnectionPool(max_size=1, check_after=0)
+        conn = pool.getconn(self.connect)
+        pool.putconn(conn)
+        conn.close()
+        fresh = pool.getconn(self.connect)
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(fresh.execute('SELECT 1').fetchone(), (1,))
+        self.assertEqual(pool.stats()['replaced'], 1)
+
+
+class SQLiteTuningTests(TransactionTestCase):
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+
+    def test_connection_is_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            User.objects.create_user('writer')
+        self.assertEqual(queries.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+
+@plain_static
+class SharingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='modern', name='Modern')
+        cls.cv = CV.objects.create(owner=cls.user, title='CV', full_name='Jane Doe', email='jane@example.com',
+                                   template=cls.template, summary='Builds things.')
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(CV_SHARE_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_login(self.user)
+
+    def post(self, action):
+        response = self.client.post(reverse('cv_preview', args=[self.cv.pk]), {'action': action})
+        self.assertEqual(response.status_code, 302)
+        self.cv.refresh_from_db()
+
+    def test_published_snapshot_is_self_contained_and_served_without_queries(self):
+        self.post('publish')
+        url = sharing.snapshot_url(self.cv.share_token)
+        self.client.logout()
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        html = b''.join(response.streaming_content).decode()
+        self.assertIn('Jane Doe', html)
+        self.assertIn('<style>', html)
+        self.assertNotIn('<link', html)
+        self.assertNotIn('csrfmiddlewaretoken', html)
+        self.assertIn('max-age=', response['Cache-Control'])
+
+        revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_snapshot_follows_edits_and_unpublish(self):
+        self.post('publish')
+        path = sharing.snapshot_path(self.cv.share_token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.summary = 'Ships things.'
+            self.cv.save()
+        self.assertIn('Ships things.', path.read_text())
+
+        token = self.cv.share_token
+        self.post('unpublish')
+        self.assertIsNone(self.cv.share_token)
+        self.assertFalse(path.exists())
+        self.assertEqual(self.client.get(sharing.snapshot_url(token)).status_code, 404)
+
+
+@plain_static
+class RerenderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='modern', name='Modern')
+        cls.cvs = [
+            CV.objects.create(owner=user, title=f'CV {i}', full_name='Jane Doe', template=cls.template)
+            for i in range(3)
+        ]
+        CV.objects.filter(pk=cls.cvs[0].pk).update(share_token='t' * 32)
+        cls.cvs[0].share_token = 't' * 32
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        settings_override = override_settings(CV_PDF_ROOT=self.tmp / 'pdf', CV_SHARE_ROOT=self.tmp / 'shared')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def rerender(self, **options):
+        stderr = StringIO()
+        call_command('rerender_cvs', workers=1, chunk_size=1, state=str(self.tmp / 'state.json'),
+                     stdout=StringIO(), stderr=stderr, **options)
+        return stderr.getvalue()
+
+    def test_writes_pdfs_and_snapshots(self):
+        self.rerender(templates=['modern'])
+        for cv in self.cvs:
+            self.assertTrue(pdf_path(cv, 'modern').exists())
+        self.assertIn('Jane Doe', sharing.snapshot_path(self.cvs[0].share_token).read_text())
+        self.assertFalse((self.tmp / 'state.json').exists())
+
+    def test_interrupted_run_resumes_after_last_finished_chunk(self):
+        with mock.patch('cv_app.management.commands.rerender_cvs.render_chunk', side_effect=[
+            prewarm.render_chunk([self.cvs[0].pk], {'pdf': True}), KeyboardInterrupt,
+        ]):
+            with self.assertRaises(KeyboardInterrupt):
+                self.rerender()
+        self.assertEqual(json.loads((self.tmp / 'state.json').read_text())['done_through'], self.cvs[0].pk)
+
+        output = self.rerender()
+        self.assertIn(f'Resuming after CV {self.cvs[0].pk}', output)
+        self.assertIn('2/2 CVs', output)
+        self.assertTrue(pdf_path(self.cvs[2], 'modern').exists())
+
+    def test_populate_templates_reports_changed_sources(self):
+        call_command('populate_templates', stdout=StringIO())
+        CVTemplate.objects.filter(slug='modern').update(render_signature='outdated')
+        stdout = StringIO()
+        with mock.patch('cv_app.management.commands.populate_templates.call_command') as rerender:
+            call_command('populate_templates', rerender=True, stdout=stdout)
+        self.assertEqual(rerender.call_args.kwargs['templates'], ['modern'])
+        self.assertEqual(CVTemplate.objects.get(slug='modern').render_signature,
+                         template_source_signature('modern'))
+
+
+@plain_static
+class AdminBulkActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='pw')
+        cls.old = CVTemplate.objects.create(slug='classic', name='Classic')
+        cls.new = CVTemplate.objects.create(slug='modern', name='Modern')
+        cls.cvs = [CV.objects.create(owner=cls.admin, title=f'CV {i}', template=cls.old) for i in range(5)]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def act(self, model, action, **data):
+        url = reverse(f'admin:cv_app_{model}_changelist')
+        return self.client.post(url, {'action': action, 'index': 0, **data})
+
+    def test_reassign_template_updates_in_one_statement(self):
+        before = dict(CV.objects.values_list('pk', 'updated_at'))
+        revisions = CVRevision.objects.count()
+        page = self.act('cv', 'reassign_template', select_across=1, _selected_action=[self.cvs[0].pk])
+        self.assertContains(page, 'Every CV matching')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.act('cv', 'reassign_template', select_across=1,
+                                _selected_action=[self.cvs[0].pk], apply='yes', template=self.new.pk)
+        self.assertEqual(response.status_code, 302)
+        updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "cv_app_cv"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(CV.objects.filter(template=self.new).count(), 5)
+        after = dict(CV.objects.values_list('pk', 'updated_at'))
+        self.assertTrue(all(after[pk] > before[pk] for pk in before))
+        self.assertEqual(CVRevision.objects.count(), revisions)
+
+    def test_dashboard_etag_changes_when_templates_swap(self):
+        # Templates 1 and 3 moved to 2 keep the sum of template ids unchanged
+        third = CVTemplate.objects.create(slug='minimal', name='Minimal')
+        CV.objects.filter(pk=self.cvs[0].pk).update(template=third)
+        CV.objects.filter(pk__in=[cv.pk for cv in self.cvs[2:]]).delete()
+        dashboard = self.client.get(reverse('dashboard'))
+        self.assertContains(dashboard, 'Minimal')
+
+        self.act('cv', 'reassign_template', _selected_action=[self.cvs[0].pk, self.cvs[1].pk],
+                 apply='yes', template=self.new.pk)
+        response = self.client.get(reverse('dashboard'), HTTP_IF_NONE_MATCH=dashboard['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Minimal')
+        self.assertNotContains(response, 'Classic')
+
+    def test_deactivate_and_migrate(self):
+        template_registry.invalidate()
+        response = self.act('cvtemplate', 'deactivate_and_migrate', _selected_action=[self.old.pk],
+                            apply='yes', template=self.new.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(CVTemplate.objects.get(pk=self.old.pk).active)
+        self.assertFalse(CV.objects.filter(template=self.old).exists())
+        self.assertIsNone(template_registry.get_by_slug('classic'))
+
+    def test_cannot_migrate_to_a_template_being_retired(self):
+        response = self.act('cvtemplate', 'deactivate_and_migrate', _selected_action=[self.old.pk, self.new.pk],
+                            apply='yes', template=self.new.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(CVTemplate.objects.get(pk=self.new.pk).active)
+
+    def test_export_selected_streams_json_lines(self):
+        response = self.act('cv', 'export_selected', _selected_action=[cv.pk for cv in self.cvs[:2]])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(sorted(json.loads(line)['title'] for line in lines), ['CV 0', 'CV 1'])
+
+    def test_change_form_edits_sections(self):
+        cv = self.cvs[0]
+        cv.experience = [{'company': 'Acme', 'position': 'Engineer'}]
+        cv.save()
+        page = self.client.get(reverse('admin:cv_app_cv_change', args=[cv.pk]))
+        self.assertContains(page, 'Acme')
+
+        data = {'owner': self.admin.pk, 'title': cv.title, 'template': self.old.pk, 'full_name': 'Jane Doe',
+                'email': 'jane@example.com', 'experience': json.dumps(cv.experience),
+                'education': '[{"institution": "Uni", "degree": "BSc"}]', 'projects': '[]'}
+        response = self.client.post(reverse('admin:cv_app_cv_change', args=[cv.pk]), data)
+        self.assertEqual(response.status_code, 302)
+        cv = CV.objects.get(pk=cv.pk)
+        self.assertEqual(cv.experience[0]['company'], 'Acme')
+        self.assertEqual(cv.education[0]['institution'], 'Uni')
+
+        data['projects'] = '{"name": "not a list"}'
+        response = self.client.post(reverse('admin:cv_app_cv_change', args=[cv.pk]), data)
+        self.assertContains(response, 'projects must be a list')
+
+
+class PhotoStorageTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = CV._meta.get_field('photo').storage
+        self.user = User.objects.create_user('owner', password='pw')
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.storage.save('photos/a.jpg', ContentFile(b'same bytes'))
+        second = self.storage.save('photos/b.JPG', ContentFile(b'same bytes'))
+        self.assertEqual(first, second)
+        self.assertEqual(len(list((self.root / 'photos').iterdir())), 1)
+
+    def test_addressed_looking_upload_names_are_hashed(self):
+        victim = self.storage.save('photos/a.jpg', ContentFile(b'victim photo'))
+        forged = self.storage.save(victim, ContentFile(b'someone else'))
+        self.assertNotEqual(forged, victim)
+        self.assertEqual(self.storage.open(victim).read(), b'victim photo')
+
+    def gc(self):
+        call_command('gc_photos', min_age=60, stdout=StringIO())
+
+    def age(self, name, seconds=3600):
+        old = time.time() - seconds
+        os.utime(self.storage.path(name), (old, old))
+
+    def test_gc_deletes_only_old_unreferenced_files(self):
+        kept = self.storage.save('photos/a.jpg', ContentFile(b'referenced'))
+        orphan = self.storage.save('photos/b.jpg', ContentFile(b'orphan'))
+        young = self.storage.save('photos/c.jpg', ContentFile(b'just uploaded'))
+        CV.objects.create(owner=self.user, title='CV', photo=kept)
+        self.age(kept)
+        self.age(orphan)
+        self.gc()
+        self.assertTrue(self.storage.exists(kept))
+        self.assertFalse(self.storage.exists(orphan))
+        self.assertTrue(self.storage.exists(young))
+
+    def test_dedupe_onto_an_old_file_protects_it_from_gc(self):
+        name = self.storage.save('photos/a.jpg', ContentFile(b'photo'))
+        self.age(name)
+        # A new upload reuses the file before its CV row is saved
+        self.assertEqual(self.storage.save('photos/b.jpg', ContentFile(b'photo')), name)
+        self.gc()
+        self.assertTrue(self.storage.exists(name))
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+        cls.template = CVTemplate.objects.create(slug='modern', name='Modern')
+
+    def line(self, **data):
+        return json.dumps({'owner': 'owner', 'title': 'CV', 'full_name': 'Jane Doe', 'email': 'jane@example.com',
+                           'template': 'modern', **data})
+
+    def test_item_validation_names_the_offending_item(self):
+        items = [{'company': 'Acme', 'responsibilities': ['Build', 'Ship']}, {}, {'company': 'x' * 201}]
+        with self.assertRaisesMessage(ValidationError, 'experience[2]: company:'):
+            clean_items('experience', items)
+        self.assertEqual(clean_items('experience', items[:2])[0]['responsibilities'], ['Build', 'Ship'])
+
+    def test_invalid_lines_are_skipped_and_reported(self):
+        lines = [
+            self.line(title='Good', experience=[{'company': 'Acme'}]),
+            '{not json',
+            self.line(owner='nobody'),
+            self.line(template='missing'),
+            self.line(education=[{'degree': 'x' * 201}]),
+            self.line(photo='../settings.py'),
+            '',
+            self.line(title='Also good', photo='photos/absent.jpg'),
+        ]
+        result = import_lines(lines, batch_size=1)
+        self.assertEqual(result.created, 2)
+        errors = dict(result.errors)
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6])
+        self.assertTrue(errors[2].startswith('invalid JSON'))
+        self.assertIn('unknown owner', errors[3])
+        self.assertIn('invalid photo name', errors[6])
+        good = CV.objects.get(title='Good')
+        self.assertEqual(good.experience[0]['company'], 'Acme')
+        self.assertEqual(good.template, self.template)
+        self.assertFalse(CV.objects.get(title='Also good').photo)
+
+    def test_export_command_round_trips(self):
+        other = User.objects.create_user('other', password='pw')
+        CV.objects.create(owner=self.user, title='Mine', full_name='Jane Doe', email='jane@example.com',
+                          template=self.template,
+                          projects=[{'name': 'AgriConnect', 'description': '', 'technologies': '', 'status': ''}])
+        CV.objects.create(owner=other, title='Theirs')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'cvs.jsonl'
+            call_command('export_cvs', user='owner', output=str(path), stderr=StringIO())
+            lines = path.read_text(encoding='utf-8').splitlines()
+            self.assertEqual([json.loads(line)['title'] for line in lines], ['Mine'])
+
+            stdout = StringIO()
+            call_command('import_cvs', str(path), user='other', stdout=stdout, stderr=StringIO())
+        self.assertIn('Imported 1 CVs', stdout.getvalue())
+        copy = CV.objects.get(owner=other, title='Mine')
+        self.assertEqual(copy.projects[0]['name'], 'AgriConnect')
+        self.assertEqual(copy.template, self.template)
+
+
+@plain_static
+@override_settings(ROOT_URLCONF='cv_app.tests', CV_PROFILING_SLOW_MS=0, CV_PROFILING_FLUSH_SECONDS=0)
+@modify_settings(MIDDLEWARE={'prepend': 'cv_builder.profiling.ProfilingMiddleware'})
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dumps = Path(tmp.name)
+        settings_override = override_settings(CV_PROFILING_DIR=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.async_client.force_login(self.user)
+
+    def timings(self, response):
+        return dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+
+    @override_settings(CV_PROFILING_SAMPLE_RATE=1)
+    def test_sync_request_reports_timings_dumps_profile_and_flushes_summary(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard'))
+        timings = self.timings(response)
+        self.assertRegex(timings['db'], r'queries"$')
+        self.assertNotIn('desc="0 queries"', timings['db'])
+        self.assertEqual(set(timings), {'db', 'tpl', 'dbpool', 'total'})
+        self.assertEqual(len(list(self.dumps.glob('dashboard-*.prof'))), 1)
+        summary = RequestTimingSummary.objects.get(url_name='dashboard')
+        self.assertEqual((summary.count, summary.pid), (1, os.getpid()))
+
+    @override_settings(CV_PROFILING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_profiled(self):
+        self.client.get(reverse('dashboard'))
+        self.assertEqual(list(self.dumps.iterdir()), [])
+
+    # WhiteNoise and the snapshot middleware are sync-only and would switch the whole chain to sync
+    @override_settings(CV_PROFILING_SAMPLE_RATE=1, MIDDLEWARE=[
+        'cv_builder.profiling.ProfilingMiddleware',
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+    ])
+    async def test_async_view_is_timed_without_profiling(self):
+        # Servers open a connection per request thread; the test's was opened before the middleware loaded
+        await sync_to_async(profiling.install_sql_timer)(connection)
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', self.timings(response)['db'])
+        self.assertEqual(list(self.dumps.iterdir()), [])
+        self.assertTrue(await RequestTimingSummary.objects.filter(url_name='dashboard').aexists())
+
+
+class PdfQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('owner', password='pw')
+        cls.cv = CV.objects.create(owner=user, title='CV', full_name='Jane Doe', email='jane@example.com',
+                                   experience=[{'company': 'Acme', 'position': 'Engineer'}])
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(CV_PDF_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.path = pdf_path(self.cv, 'classic')
+
+    def wait(self):
+        with pdf._lock:
+            futures = list(pdf._pending.values())
+        for future in futures:
+            future.result(timeout=30)
+
+    def test_render_loads_sections_before_handing_off(self):
+        cv = CV.objects.get(pk=self.cv.pk)
+        # The content row is read here, not on the pool thread's own connection
+        with self.assertNumQueries(1):
+            self.assertEqual(pdf.request_pdf(cv, 'classic'), ('pending', None))
+        self.wait()
+        self.assertEqual(pdf.request_pdf(cv, 'classic'), ('ready', self.path))
+        self.assertFalse(pdf._marker(self.path, 'lock').exists())
+
+    def test_lock_held_by_another_process_is_respected(self):
+        lock = pdf._marker(self.path, 'lock')
+        lock.parent.mkdir(parents=True)
+        lock.touch()
+        self.assertEqual(pdf.request_pdf(self.cv, 'classic'), ('pending', None))
+        self.assertEqual(pdf._pending, {})
+
+        # A lock older than the render timeout belonged to a worker that died
+        old = time.time() - 3600
+        os.utime(lock, (old, old))
+        self.assertEqual(pdf.request_pdf(self.cv, 'classic'), ('pending', None))
+        self.wait()
+        self.assertTrue(self.path.exists())
+
+    def test_failure_is_reported_once_to_any_process(self):
+        with mock.patch.object(pdf, 'render_cv_pdf', side_effect=RuntimeError('boom')), \
+                self.assertLogs('cv_app.pdf', 'ERROR'):
+            pdf.request_pdf(self.cv, 'classic')
+            self.wait()
+        # The marker is on disk, so a poll served by another process sees it too
+        self.assertEqual(pdf.request_pdf(self.cv, 'classic'), ('failed', None))
+        self.assertEqual(pdf.request_pdf(self.cv, 'classic'), ('pending', None))
+        self.wait()
+
+
+@override_settings(CV_PHOTO_MAX_SIZE=400, CV_PHOTO_THUMB_SIZE=100)
+class PhotoProcessingTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('owner', password='pw')
+        self.template = CVTemplate.objects.create(slug='advanced', name='Advanced')
+        template_registry.invalidate()
+
+    def upload(self):
+        # 600x300 landscape pixels, tagged to display rotated 90 degrees (portrait)
+        image = Image.new('RGB', (600, 300), 'red')
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buf = BytesIO()
+        image.save(buf, 'JPEG', exif=exif)
+        return SimpleUploadedFile('Holiday Photo.JPG', buf.getvalue(), content_type='image/jpeg')
+
+    def test_upload_is_rotated_downscaled_and_stored_as_variants(self):
+        form = CVForm(data={'title': 'CV', 'full_name': 'Jane Doe', 'email': 'jane@example.com',
+                            'template': self.template.pk},
+                      files={'photo': self.upload()}, instance=CV(owner=self.user))
+        self.assertTrue(form.is_valid(), form.errors)
+        cv = form.save()
+
+        names = variant_names(cv.photo.name)
+        self.assertRegex(cv.photo.name, r'^photos/[0-9a-f]{20}-main\.jpg$')
+        self.assertEqual(set(names), {'jpeg', 'webp', 'thumb_jpeg', 'thumb_webp'})
+        storage = cv.photo.storage
+        with Image.open(storage.path(names['jpeg'])) as main:
+            self.assertEqual(main.size, (200, 400))
+            self.assertNotIn(0x0112, main.getexif())
+        with Image.open(storage.path(names['thumb_webp'])) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (50, 100)))
+        self.assertEqual(cv.get_photo_variants()['thumb_jpeg'], storage.url(names['thumb_jpeg']))
+
+    def test_legacy_single_file_photo_has_no_variants(self):
+        cv = CV.objects.create(owner=self.user, title='CV', photo='photos/holiday.jpg')
+        self.assertIsNone(variant_names(cv.photo.name))
+        self.assertIsNone(cv.get_photo_variants())
+
+    def test_unprocessed_upload_has_no_variants(self):
+        # The admin's ModelForm saves the upload as is, under a content-hash name
+        cv = CV(owner=self.user, title='CV')
+        cv.photo.save('portrait.jpg', self.upload())
+        self.assertRegex(cv.photo.name, r'^photos/[0-9a-f]{20}\.jpg$')
+        self.assertIsNone(cv.get_photo_variants())
+
+
+class SectionCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('owner', password='pw')
+        cls.cv = CV.objects.create(owner=user, title='CV', links='https://a.example\nhttps://b.example',
+                                   experience=[{'company': 'Acme'}])
+
+    def test_each_section_is_decoded_once_until_reassigned_or_refreshed(self):
+        cv = CV.objects.get(pk=self.cv.pk)
+        with mock.patch.object(CV, '_parse_lines', side_effect=CV._parse_lines) as parse_lines, \
+                mock.patch.object(CV, '_as_list', side_effect=CV._as_list) as as_list:
+            for _ in range(3):
+                self.assertEqual(cv.get_links_list(), ['https://a.example', 'https://b.example'])
+                self.assertEqual(cv.get_experience_list(), [{'company': 'Acme'}])
+            self.assertEqual((parse_lines.call_count, as_list.call_count), (1, 1))
+
+            cv.links = 'https://c.example'
+            cv.experience = [{'company': 'Globex'}]
+            self.assertEqual(cv.get_links_list(), ['https://c.example'])
+            self.assertEqual(cv.get_experience_list(), [{'company': 'Globex'}])
+            self.assertEqual((parse_lines.call_count, as_list.call_count), (2, 2))
+
+            # Unsaved assignments are dropped along with the decoded values
+            cv.refresh_from_db()
+            self.assertEqual(cv.get_links_list(), ['https://a.example', 'https://b.example'])
+            self.assertEqual(cv.get_experience_list(), [{'company': 'Acme'}])
+            self.assertEqual((parse_lines.call_count, as_list.call_count), (3, 3))
+
+
+class SectionFormsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='pw')
+
+    def post_data(self, formsets):
+        """What the editor submits for ``formsets`` left unchanged."""
+        data = {}
+        for formset in formsets.values():
+            data[f'{formset.prefix}-TOTAL_FORMS'] = len(formset.forms)
+            data[f'{formset.prefix}-INITIAL_FORMS'] = 0
+            for form in formset.forms:
+                for name, value in form.initial.items():
+                    data[form.add_prefix(name)] = value
+        return data
+
+    def round_trip(self, cv):
+        formsets = bind_formsets(self.post_data(initial_formsets(cv)))
+        self.assertTrue(all(formset.is_valid() for formset in formsets.values()))
+        return encode_formsets(formsets)
+
+    def test_stored_sections_survive_the_editor_unchanged(self):
+        sections = {
+            'experience': [{'company': 'Acme', 'position': 'Engineer', 'duration': '2020–2023', 'website': '',
+                            'responsibilities': ['Build', 'Ship'], 'description': ''}],
+            'education': [{'institution': 'TU', 'degree': 'BSc', 'duration': '2016–2020', 'status': ''}],
+            'projects': [{'name': 'AgriConnect', 'description': 'Market app', 'technologies': 'Django',
+                          'status': ''}],
+        }
+        cv = CV(owner=self.user, **sections)
+        self.assertEqual(self.round_trip(cv), sections)
+
+    def test_legacy_and_empty_items(self):
+        cv = CV(owner=self.user, experience=[{'company': 'Acme', 'responsibilities': 'Lead'}, 'junk'],
+                education=[{'institution': 'TU', 'year': '2019'}], projects=[])
+        self.assertEqual(decode_education({'year': '2019'})['duration'], '2019')
+        sections = self.round_trip(cv)
+        self.assertEqual(sections['experience'][0]['responsibilities'], ['Lead'])
+        self.assertEqual(len(sections['experience']), 1)
+        self.assertEqual(sections['education'][0]['duration'], '2019')
+        # An empty section still starts with a blank item, which encodes to nothing
+        self.assertEqual(initial_formsets(cv)['proj_formset'].initial, [{}])
+        self.assertEqual(sections['projects'], [])
+        self.assertIsNone(encode_experience({'company': '', 'responsibilities': ''}))
+        self.assertIsNone(encode_education({}))
@@ -0,0 +1,130 @@
+"""Streaming JSON Lines export and batched import of CVs.
+
+Each line is one CV: its scalar fields, the three section lists, the
+template slug and the owner's username.
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.utils import validate_file_name
+from django.db import transaction
+
+from .models import CV, CVContent
+from .registry import template_registry
+from .search import build_search_text
+from .sections import SECTIONS, clean_items
+
+SCALAR_FIELDS = ('title', 'full_name', 'job_title', 'email', 'phone', 'location', 'links', 'summary', 'skills')
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+
+
+def serialize_cv(cv):
+    tmpl = template_registry.get_by_id(cv.template_id)
+    data = {field: getattr(cv, field) for field in SCALAR_FIELDS}
+    data.update({field: getattr(cv, field) for field in SECTIONS})
+    data.update({
+        'owner': cv.owner.username,
+        'template': tmpl.slug if tmpl else None,
+        'photo': cv.photo.name or None,
+        'created_at': cv.created_at.isoformat(),
+        'updated_at': cv.updated_at.isoformat(),
+    })
+    return data
+
+
+def export_lines(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one JSON line per CV, reading ``chunk_size`` rows at a time."""
+    rows = (
+        queryset.select_related('owner', 'content')
+        .only(*SCALAR_FIELDS, *(f'content__{field}' for field in SECTIONS),
+              'template', 'photo', 'created_at', 'updated_at', 'owner__username')
+        .order_by('pk')
+        .iterator(chunk_size=chunk_size)
+    )
+    for cv in rows:
+        yield json.dumps(serialize_cv(cv), ensure_ascii=False) + '\n'
+
+
+def build_cv(data, owner):
+    """Validate one decoded line and return an unsaved CV, or raise ValidationError."""
+    if not isinstance(data, dict):
+        raise ValidationError('line must be a JSON object')
+    cv = CV(owner=owner, **{field: str(data.get(field) or '') for field in SCALAR_FIELDS})
+    for field in SECTIONS:
+        setattr(cv, field, clean_items(field, data.get(field) or []))
+    slug = data.get('template')
+    if slug:
+        cv.template = template_registry.get_by_slug(slug, active_only=False)
+        if cv.template is None:
+            raise ValidationError(f'unknown template {slug!r}')
+    photo = data.get('photo')
+    if photo:
+        if not isinstance(photo, str):
+            raise ValidationError('photo must be a file name')
+        try:
+            # exists() raises for names that escape the media root
+            validate_file_name(photo, allow_relative_path=True)
+        except SuspiciousFileOperation:
+            raise ValidationError(f'invalid photo name {photo!r}')
+        if cv.photo.storage.exists(photo):
+            cv.photo = photo
+    cv.full_clean(exclude=['owner', 'template', 'photo'], validate_unique=False)
+    # bulk_create bypasses CV.save, which normally fills this
+    cv.search_text = build_search_text(cv)
+    return cv
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+
+def import_lines(lines, owner=None, batch_size=IMPORT_BATCH_SIZE):
+    """Create CVs from JSON lines in ``batch_size`` bulk inserts, one transaction per batch.
+
+    Every CV is assigned to ``owner`` when given, otherwise to the user named
+    by its ``owner`` key. Invalid lines are skipped and reported in
+    ``ImportResult.errors`` as ``(line number, message)``.
+    """
+    result = ImportResult()
+    owners = {}
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            # bulk_create bypasses CV.save, so the shared section rows are attached here
+            CVContent.attach(batch)
+            CV.objects.bulk_create(batch, batch_size=batch_size)
+        result.created += len(batch)
+        batch.clear()
+
+    for lineno, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+            cv_owner = owner
+            if cv_owner is None:
+                username = data.get('owner') if isinstance(data, dict) else None
+                if username not in owners:
+                    owners[username] = User.objects.filter(username=username).first()
+                cv_owner = owners[username]
+                if cv_owner is None:
+                    raise ValidationError(f'unknown owner {username!r}')
+            batch.append(build_cv(data, cv_owner))
+        except json.JSONDecodeError as exc:
+            result.errors.append((lineno, f'invalid JSON: {exc}'))
+            continue
+        except ValidationError as exc:
+            result.errors.append((lineno, '; '.join(exc.messages)))
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return result
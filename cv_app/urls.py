@@ -1,11 +1,22 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.CV_ASYNC_VIEWS:
+    dashboard, cv_preview = views.adashboard, views.acv_preview
+else:
+    dashboard, cv_preview = views.dashboard, views.cv_preview
+
 urlpatterns = [
     path('', views.home, name='home'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', dashboard, name='dashboard'),
     path('cv/create/', views.cv_create, name='cv_create'),
+    path('cv/export/', views.cv_export, name='cv_export'),
     path('cv/<int:cv_id>/edit/', views.cv_edit, name='cv_edit'),
-    path('cv/<int:cv_id>/preview/', views.cv_preview, name='cv_preview'),
+    path('cv/<int:cv_id>/autosave/', views.cv_autosave, name='cv_autosave'),
+    path('cv/<int:cv_id>/history/', views.cv_history, name='cv_history'),
+    path('cv/<int:cv_id>/history/<int:number>/', views.cv_revision, name='cv_revision'),
+    path('cv/<int:cv_id>/preview/', cv_preview, name='cv_preview'),
     path('cv/<int:cv_id>/delete/', views.cv_delete, name='cv_delete'),
+    path('cv/<int:cv_id>/pdf/', views.cv_pdf, name='cv_pdf'),
 ]
@@ -1,104 +1,151 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.forms import formset_factory
-import json
+from django.utils.text import capfirst, slugify
+from django.contrib.messages import get_messages
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Max
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
+from django.forms.formsets import all_valid
+
+from cv_builder.decorators import acache_control, acondition, alogin_required
+
+from .models import CV, CVContent, CVRevision, SECTION_FIELDS
+from .forms import CVForm
+from .autosave import apply_patch, cv_version, editor_config
+from .rendering import render_cv_body
+from .pdf import request_pdf
+from .registry import template_registry
+from .revisions import diff_states, load_state
+from .sections import bind_formsets, encode_formsets, initial_formsets
+from .search import search_q
+from .sharing import publish, snapshot_url, unpublish
+from .transfer import export_lines
+
+DASHBOARD_PAGE_SIZE = 20
+
+
+@lru_cache(maxsize=None)
+def _static_version():
+    # Changes whenever collectstatic produces a different manifest
+    return getattr(staticfiles_storage, 'manifest_hash', '') or ''
+
+
+def _conditional_allowed(request):
+    # Flash messages are shown once; never answer 304 while one is pending
+    return request.method in ('GET', 'HEAD') and not len(get_messages(request))
+
+
+def _make_etag(request, *parts):
+    """Combine ``parts`` with everything else the page shell depends on."""
+    shell = (request.user.pk, request.META.get('CSRF_COOKIE', ''), _static_version(),
+             template_registry.signature())
+    return hashlib.md5(repr(shell + parts).encode()).hexdigest()
+
+
+def _dashboard_etag(request):
+    if not _conditional_allowed(request):
+        return None
+    stats = CV.objects.filter(owner=request.user).aggregate(last=Max('updated_at'), total=Count('id'))
+    if not request.GET.get('q'):
+        # Reused by the view so the paginator does not count the rows again
+        request.cv_total = stats['total']
+    return _make_etag(request, stats['last'], stats['total'], request.GET.get('page'), request.GET.get('q'))
+
+
+def _preview_etag_row(request, cv_id):
+    return CV.objects.filter(id=cv_id, owner=request.user).values_list('updated_at', 'template_id', 'share_token')
+
+
+def _preview_etag(request, cv_id):
+    if not _conditional_allowed(request):
+        return None
+    return _preview_etag_for(request, cv_id, _preview_etag_row(request, cv_id).first())
 
-from .models import CV, CVTemplate
-from .forms import CVForm, ExperienceItemForm, EducationItemForm, ProjectItemForm
+
+def _preview_etag_for(request, cv_id, row):
+    if row is None:
+        return None
+    updated_at, template_id, share_token = row
+    override = template_registry.get_by_slug((request.GET.get('template') or '').strip())
+    tmpl = override or template_registry.get_by_id(template_id)
+    return _make_etag(request, cv_id, updated_at, tmpl.slug if tmpl else None,
+                      request.GET.get('compact') == '1', share_token)
+
+
+TEMPLATE_DESCRIPTIONS = {
+    'classic': 'Conservative, two-column layout',
+    'modern': 'Color accents, clean headings',
+    'minimal': 'Single-column, ATS-friendly',
+    'advanced': 'Distinct, ATS-friendly with optional photo',
+}
 
 
 def home(request):
     context = {
         'templates': [
             {
-                'name': 'Classic',
-                'slug': 'classic',
-                'description': 'Conservative, two-column layout',
-                'preview': 'img/template_previews/classic.png'
-            },
-            {
-                'name': 'Modern',
-                'slug': 'modern',
-                'description': 'Color accents, clean headings',
-                'preview': 'img/template_previews/modern.png'
-            },
-            {
-                'name': 'Minimal',
-                'slug': 'minimal',
-                'description': 'Single-column, ATS-friendly',
-                'preview': 'img/template_previews/minimal.png'
-            },
-            {
-                'name': 'Advanced',
-                'slug': 'advanced',
-                'description': 'Distinct, ATS-friendly with optional photo',
-                'preview': 'img/template_previews/advanced.png'
+                'name': tmpl.name,
+                'slug': tmpl.slug,
+                'description': TEMPLATE_DESCRIPTIONS.get(tmpl.slug, ''),
+                'preview': tmpl.preview_image,
             }
+            for tmpl in template_registry.active()
         ]
     }
     return render(request, 'home.html', context)
 
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_dashboard_etag)
 def dashboard(request):
-    cvs = CV.objects.filter(owner=request.user).order_by('-updated_at')
-    context = {'cvs': cvs}
+    query = (request.GET.get('q') or '').strip()
+    paginator = Paginator(_dashboard_queryset(request, query), DASHBOARD_PAGE_SIZE)
+    if hasattr(request, 'cv_total'):
+        paginator.count = request.cv_total
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return _render_dashboard(request, page_obj, query)
+
+
+def _dashboard_queryset(request, query):
+    # One joined query for exactly the columns the cards show
+    return (
+        CV.objects.filter(owner=request.user)
+        .filter(search_q(query))
+        .select_related('template')
+        .only('id', 'title', 'updated_at', 'template__name')
+        .order_by('-updated_at', '-id')
+    )
+
+
+def _render_dashboard(request, page_obj, query):
+    context = {'cvs': page_obj, 'page_obj': page_obj, 'query': query}
     return render(request, 'dashboard.html', context)
 
 
 @login_required
 def cv_create(request):
-    ExperienceFormSet = formset_factory(ExperienceItemForm, extra=1, can_delete=True)
-    EducationFormSet = formset_factory(EducationItemForm, extra=1, can_delete=True)
-    ProjectFormSet = formset_factory(ProjectItemForm, extra=1, can_delete=True)
-
     if request.method == 'POST':
         form = CVForm(request.POST, request.FILES)
-        exp_fs = ExperienceFormSet(request.POST, prefix='exp')
-        edu_fs = EducationFormSet(request.POST, prefix='edu')
-        proj_fs = ProjectFormSet(request.POST, prefix='proj')
+        formsets = bind_formsets(request.POST)
         # Determine selected template for conditional UI
-        is_advanced_template = False
-        tmpl_id = (request.POST.get('template') or '').strip()
-        if tmpl_id:
-            try:
-                sel = CVTemplate.objects.get(id=tmpl_id)
-                is_advanced_template = (sel.slug == 'advanced')
-            except CVTemplate.DoesNotExist:
-                is_advanced_template = False
-
-        if form.is_valid() and exp_fs.is_valid() and edu_fs.is_valid() and proj_fs.is_valid():
-            # Build JSON payloads from non-empty rows
-            def non_empty(forms, keys):
-                items = []
-                for f in forms:
-                    if getattr(f, 'cleaned_data', None) and not f.cleaned_data.get('DELETE'):
-                        if any(f.cleaned_data.get(k, '').strip() for k in keys):
-                            items.append({k: f.cleaned_data.get(k, '').strip() for k in keys})
-                return items
-            # Build experience with website and responsibilities as list
-            exp_items = []
-            for f in exp_fs.forms:
-                cd = getattr(f, 'cleaned_data', {}) or {}
-                if cd and not cd.get('DELETE'):
-                    if any((cd.get('company') or cd.get('position') or cd.get('duration') or cd.get('website') or cd.get('description') or cd.get('responsibilities'))):
-                        resp_raw = cd.get('responsibilities') or ''
-                        responsibilities = [ln.strip() for ln in resp_raw.splitlines() if ln.strip()]
-                        exp_items.append({
-                            'company': (cd.get('company') or '').strip(),
-                            'position': (cd.get('position') or '').strip(),
-                            'duration': (cd.get('duration') or '').strip(),
-                            'website': (cd.get('website') or '').strip(),
-                            'responsibilities': responsibilities,
-                            'description': (cd.get('description') or '').strip(),
-                        })
-            edu_items = non_empty(edu_fs.forms, ['institution', 'degree', 'duration', 'status'])
-            proj_items = non_empty(proj_fs.forms, ['name', 'description', 'technologies', 'status'])
-
-            form.instance.experience = json.dumps(exp_items, ensure_ascii=False)
-            form.instance.education = json.dumps(edu_items, ensure_ascii=False)
-            form.instance.projects = json.dumps(proj_items, ensure_ascii=False)
+        sel = template_registry.get_by_id((request.POST.get('template') or '').strip())
+        is_advanced_template = bool(sel and sel.slug == 'advanced')
+
+        if form.is_valid() and all_valid(formsets.values()):
+            for field, items in encode_formsets(formsets).items():
+                setattr(form.instance, field, items)
 
             cv = form.save(commit=False)
             cv.owner = request.user
@@ -110,138 +157,113 @@ def cv_create(request):
         initial = {}
         is_advanced_template = False
         if template_slug:
-            try:
-                tmpl = CVTemplate.objects.get(slug=template_slug, active=True)
+            tmpl = template_registry.get_by_slug(template_slug)
+            if tmpl is not None:
                 initial = {'template': tmpl}
                 is_advanced_template = (tmpl.slug == 'advanced')
-            except CVTemplate.DoesNotExist:
-                initial = {}
         else:
             # No template chosen yet: show selection page first
-            templates = CVTemplate.objects.filter(active=True).order_by('name')
+            templates = template_registry.active()
             return render(request, 'cv/select_template.html', {'templates': templates})
         form = CVForm(initial=initial)
-        exp_fs = ExperienceFormSet(prefix='exp')
-        edu_fs = EducationFormSet(prefix='edu')
-        proj_fs = ProjectFormSet(prefix='proj')
+        formsets = bind_formsets()
 
     return render(request, 'cv/create.html', {
         'form': form,
-        'exp_formset': exp_fs,
-        'edu_formset': edu_fs,
-        'proj_formset': proj_fs,
+        **formsets,
         'is_advanced_template': is_advanced_template,
     })
 
 
 @login_required
 def cv_edit(request, cv_id):
-    cv = get_object_or_404(CV, id=cv_id, owner=request.user)
-    ExperienceFormSet = formset_factory(ExperienceItemForm, extra=1, can_delete=True)
-    EducationFormSet = formset_factory(EducationItemForm, extra=1, can_delete=True)
-    ProjectFormSet = formset_factory(ProjectItemForm, extra=1, can_delete=True)
+    cv = get_object_or_404(CV.objects.select_related('content'), id=cv_id, owner=request.user)
 
     if request.method == 'POST':
         form = CVForm(request.POST, request.FILES, instance=cv)
-        exp_fs = ExperienceFormSet(request.POST, prefix='exp')
-        edu_fs = EducationFormSet(request.POST, prefix='edu')
-        proj_fs = ProjectFormSet(request.POST, prefix='proj')
+        formsets = bind_formsets(request.POST)
         # Determine selected template from POST
-        is_advanced_template = False
-        tmpl_id = (request.POST.get('template') or '').strip()
-        if tmpl_id:
-            try:
-                sel = CVTemplate.objects.get(id=tmpl_id)
-                is_advanced_template = (sel.slug == 'advanced')
-            except CVTemplate.DoesNotExist:
-                is_advanced_template = False
-
-        if form.is_valid() and exp_fs.is_valid() and edu_fs.is_valid() and proj_fs.is_valid():
-            def non_empty(forms, keys):
-                items = []
-                for f in forms:
-                    if getattr(f, 'cleaned_data', None) and not f.cleaned_data.get('DELETE'):
-                        if any(f.cleaned_data.get(k, '').strip() for k in keys):
-                            items.append({k: f.cleaned_data.get(k, '').strip() for k in keys})
-                return items
-            # Build experience with website and responsibilities as list
-            exp_items = []
-            for f in exp_fs.forms:
-                cd = getattr(f, 'cleaned_data', {}) or {}
-                if cd and not cd.get('DELETE'):
-                    if any((cd.get('company') or cd.get('position') or cd.get('duration') or cd.get('website') or cd.get('description') or cd.get('responsibilities'))):
-                        resp_raw = cd.get('responsibilities') or ''
-                        responsibilities = [ln.strip() for ln in resp_raw.splitlines() if ln.strip()]
-                        exp_items.append({
-                            'company': (cd.get('company') or '').strip(),
-                            'position': (cd.get('position') or '').strip(),
-                            'duration': (cd.get('duration') or '').strip(),
-                            'website': (cd.get('website') or '').strip(),
-                            'responsibilities': responsibilities,
-                            'description': (cd.get('description') or '').strip(),
-                        })
-            edu_items = non_empty(edu_fs.forms, ['institution', 'degree', 'duration', 'status'])
-            proj_items = non_empty(proj_fs.forms, ['name', 'description', 'technologies', 'status'])
-
-            form.instance.experience = json.dumps(exp_items, ensure_ascii=False)
-            form.instance.education = json.dumps(edu_items, ensure_ascii=False)
-            form.instance.projects = json.dumps(proj_items, ensure_ascii=False)
+        sel = template_registry.get_by_id((request.POST.get('template') or '').strip())
+        is_advanced_template = bool(sel and sel.slug == 'advanced')
+
+        if form.is_valid() and all_valid(formsets.values()):
+            for field, items in encode_formsets(formsets).items():
+                setattr(form.instance, field, items)
 
             form.save()
             messages.success(request, 'CV updated successfully!')
             return redirect('dashboard')
     else:
         form = CVForm(instance=cv)
-        is_advanced_template = (cv.template.slug == 'advanced') if cv.template else False
-        try:
-            exp_initial = json.loads(cv.experience) if cv.experience else []
-        except json.JSONDecodeError:
-            exp_initial = []
-        try:
-            edu_initial = json.loads(cv.education) if cv.education else []
-        except json.JSONDecodeError:
-            edu_initial = []
-        try:
-            proj_initial = json.loads(cv.projects) if cv.projects else []
-        except json.JSONDecodeError:
-            proj_initial = []
-
-        # Normalize keys to match form fields and keep all fields
-        exp_initial = [{
-            'company': item.get('company', ''),
-            'position': item.get('position', ''),
-            'duration': item.get('duration', ''),
-            'website': item.get('website', ''),
-            # responsibilities stored as list -> show as newline-separated in textarea
-            'responsibilities': '\n'.join(item.get('responsibilities', []) if isinstance(item.get('responsibilities'), list) else [item.get('responsibilities', '')]).strip(),
-            'description': item.get('description', ''),
-        } for item in exp_initial]
-
-        edu_initial = [{
-            'institution': item.get('institution', ''),
-            'degree': item.get('degree', ''),
-            'duration': item.get('duration', item.get('year', '')),
-            'status': item.get('status', ''),
-        } for item in edu_initial]
-
-        proj_initial = [{
-            'name': item.get('name', ''),
-            'description': item.get('description', ''),
-            'technologies': item.get('technologies', ''),
-            'status': item.get('status', ''),
-        } for item in proj_initial]
-
-        exp_fs = ExperienceFormSet(initial=exp_initial or [{}], prefix='exp')
-        edu_fs = EducationFormSet(initial=edu_initial or [{}], prefix='edu')
-        proj_fs = ProjectFormSet(initial=proj_initial or [{}], prefix='proj')
+        current = template_registry.get_by_id(cv.template_id)
+        is_advanced_template = bool(current and current.slug == 'advanced')
+        formsets = initial_formsets(cv)
 
     return render(request, 'cv/edit.html', {
         'form': form,
         'cv': cv,
-        'exp_formset': exp_fs,
-        'edu_formset': edu_fs,
-        'proj_formset': proj_fs,
+        **formsets,
         'is_advanced_template': is_advanced_template,
+        'autosave_config': editor_config(cv),
+    })
+
+
+@login_required
+@require_http_methods(['PATCH'])
+def cv_autosave(request, cv_id):
+    try:
+        patch = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': 'invalid JSON'}, status=400)
+    try:
+        with transaction.atomic():
+            cv = get_object_or_404(CV.objects.select_for_update(), id=cv_id, owner=request.user)
+            # Refuse patches built against an older version than the stored one
+            if not isinstance(patch, dict) or patch.get('version') != cv_version(cv):
+                return JsonResponse({'error': 'conflict', 'version': cv_version(cv)}, status=409)
+            changed = apply_patch(cv, patch)
+            if changed:
+                cv.save(update_fields=[*changed, 'updated_at'])
+    except ValidationError as exc:
+        return JsonResponse({'error': 'invalid', 'messages': exc.messages}, status=400)
+    return JsonResponse({'version': cv_version(cv), 'changed': changed})
+
+
+@login_required
+def cv_history(request, cv_id):
+    cv = get_object_or_404(CV.objects.only('id', 'title', 'owner_id'), id=cv_id, owner=request.user)
+    revisions = cv.revisions.order_by('-number').values('number', 'created_at', 'depth')
+    page_obj = Paginator(revisions, 50).get_page(request.GET.get('page'))
+    return render(request, 'cv/history.html', {'cv': cv, 'page_obj': page_obj})
+
+
+def _field_label(field):
+    if field in SECTION_FIELDS:
+        return CVContent._meta.get_field(field).verbose_name
+    return CV._meta.get_field(field.removesuffix('_id')).verbose_name
+
+
+@login_required
+def cv_revision(request, cv_id, number):
+    cv = get_object_or_404(CV.objects.only('id', 'title', 'owner_id'), id=cv_id, owner=request.user)
+    try:
+        after = load_state(cv.pk, number)
+        against = request.GET.get('against')
+        if against is None:
+            against = (cv.revisions.filter(number__lt=number).order_by('-number')
+                       .values_list('number', flat=True).first())
+        before = load_state(cv.pk, int(against)) if against is not None else None
+    except (CVRevision.DoesNotExist, ValueError):
+        raise Http404('No such revision.')
+    changes = [
+        (capfirst(_field_label(field)), lines)
+        for field, lines in diff_states(before, after)
+    ]
+    return render(request, 'cv/revision.html', {
+        'cv': cv,
+        'number': number,
+        'against': against,
+        'changes': changes,
     })
 
 
@@ -256,62 +278,152 @@ def cv_delete(request, cv_id):
 
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_preview_etag)
 def cv_preview(request, cv_id):
     cv = get_object_or_404(CV, id=cv_id, owner=request.user)
-    # Allow saving the selected preview template or saving as a new CV
     if request.method == 'POST':
-        action = (request.POST.get('action') or '').strip()
-        sel_slug = (request.POST.get('template') or '').strip()
-        try:
-            sel_template = CVTemplate.objects.get(slug=sel_slug, active=True) if sel_slug else cv.template
-        except CVTemplate.DoesNotExist:
-            sel_template = cv.template
-        if action == 'save_template':
-            cv.template = sel_template
-            cv.save(update_fields=['template', 'updated_at'])
-            messages.success(request, 'Template updated for this CV.')
-            return redirect('cv_preview', cv_id=cv.id)
-        elif action == 'save_as_new':
-            new_cv = CV(
-                owner=request.user,
-                title=f"{cv.title} (Copy)",
-                template=sel_template,
-                full_name=cv.full_name,
-                job_title=cv.job_title,
-                email=cv.email,
-                phone=cv.phone,
-                location=cv.location,
-                links=cv.links,
-                summary=cv.summary,
-                skills=cv.skills,
-                experience=cv.experience,
-                education=cv.education,
-                projects=cv.projects,
-                photo=cv.photo,
-            )
-            new_cv.save()
-            messages.success(request, 'Saved as a new CV with the selected template.')
-            return redirect('cv_preview', cv_id=new_cv.id)
+        response = _cv_preview_post(request, cv)
+        if response is not None:
+            return response
+    return _render_preview(request, cv)
 
+
+def _cv_preview_post(request, cv):
+    # Allow saving the selected preview template or saving as a new CV
+    current_template = template_registry.get_by_id(cv.template_id)
+    action = (request.POST.get('action') or '').strip()
+    sel_slug = (request.POST.get('template') or '').strip()
+    sel_template = template_registry.get_by_slug(sel_slug) or current_template
+    if action == 'save_template':
+        cv.template = sel_template
+        cv.save(update_fields=['template', 'updated_at'])
+        messages.success(request, 'Template updated for this CV.')
+        return redirect('cv_preview', cv_id=cv.id)
+    elif action == 'save_as_new':
+        new_cv = CV(
+            owner=request.user,
+            title=f"{cv.title} (Copy)",
+            template=sel_template,
+            full_name=cv.full_name,
+            job_title=cv.job_title,
+            email=cv.email,
+            phone=cv.phone,
+            location=cv.location,
+            links=cv.links,
+            summary=cv.summary,
+            skills=cv.skills,
+            # Copy-on-write: both CVs share the section lists until one is edited
+            content_id=cv.content_id,
+            photo=cv.photo,
+        )
+        new_cv.save()
+        messages.success(request, 'Saved as a new CV with the selected template.')
+        return redirect('cv_preview', cv_id=new_cv.id)
+    elif action == 'publish':
+        publish(cv)
+        messages.success(request, 'Anyone with the public link can now view this CV.')
+        return redirect('cv_preview', cv_id=cv.id)
+    elif action == 'unpublish':
+        unpublish(cv)
+        messages.success(request, 'The public link no longer works.')
+        return redirect('cv_preview', cv_id=cv.id)
+    return None
+
+
+def _render_preview(request, cv):
     # Optional override to preview as another template without saving (GET)
     override_slug = (request.GET.get('template') or '').strip()
     print_compact = (request.GET.get('compact') == '1')
-    if override_slug:
-        try:
-            tmpl = CVTemplate.objects.get(slug=override_slug, active=True)
-            template_slug = tmpl.slug
-        except CVTemplate.DoesNotExist:
-            template_slug = cv.template.slug
-    else:
-        template_slug = cv.template.slug
+    tmpl = template_registry.get_by_slug(override_slug) if override_slug else None
+    template_slug = (tmpl or template_registry.get_by_id(cv.template_id)).slug
 
     template_name = f'cv/preview_{template_slug}.html'
-    templates = CVTemplate.objects.filter(active=True).order_by('name')
+    templates = template_registry.active()
     return render(request, template_name, {
         'cv': cv,
+        'cv_body': render_cv_body(cv, template_slug, print_compact),
         'templates': templates,
         'current_template_slug': template_slug,
         'print_compact': print_compact,
+        'share_url': request.build_absolute_uri(snapshot_url(cv.share_token)) if cv.share_token else None,
     })
 
-# Create your views here.
+
+@login_required
+def cv_pdf(request, cv_id):
+    cv = get_object_or_404(CV, id=cv_id, owner=request.user)
+    tmpl = template_registry.get_by_slug((request.GET.get('template') or '').strip())
+    tmpl = tmpl or template_registry.get_by_id(cv.template_id)
+    template_slug = tmpl.slug if tmpl else 'classic'
+    print_compact = (request.GET.get('compact') == '1')
+
+    status, path = request_pdf(cv, template_slug, print_compact)
+    if status == 'ready':
+        filename = f"{slugify(cv.title) or 'cv'}.pdf"
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename,
+                            content_type='application/pdf')
+    if status == 'failed':
+        return JsonResponse({'status': 'failed'}, status=500)
+    response = JsonResponse({'status': status}, status=202 if status == 'pending' else 503)
+    response['Retry-After'] = '1' if status == 'pending' else '5'
+    return response
+
+
+@login_required
+def cv_export(request):
+    response = StreamingHttpResponse(
+        export_lines(CV.objects.filter(owner=request.user)),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{request.user.username}-cvs.jsonl"'
+    return response
+
+
+# Async variants of the read-heavy pages, routed when CV_ASYNC_VIEWS is on.
+# Queries go through the async ORM; rendering and anything touching the
+# template registry run on a worker thread, as they may still hit the database.
+
+async def _adashboard_etag(request):
+    if not _conditional_allowed(request):
+        return None
+    stats = await CV.objects.filter(owner=request.user).aaggregate(last=Max('updated_at'), total=Count('id'))
+    if not request.GET.get('q'):
+        request.cv_total = stats['total']
+    return await sync_to_async(_make_etag)(
+        request, stats['last'], stats['total'], request.GET.get('page'), request.GET.get('q'))
+
+
+async def _apreview_etag(request, cv_id):
+    if not _conditional_allowed(request):
+        return None
+    row = await _preview_etag_row(request, cv_id).afirst()
+    return await sync_to_async(_preview_etag_for)(request, cv_id, row)
+
+
+@alogin_required
+@acache_control(private=True, no_cache=True)
+@acondition(etag_func=_adashboard_etag)
+async def adashboard(request):
+    query = (request.GET.get('q') or '').strip()
+    cvs = _dashboard_queryset(request, query)
+    paginator = Paginator(cvs, DASHBOARD_PAGE_SIZE)
+    paginator.count = request.cv_total if hasattr(request, 'cv_total') else await cvs.acount()
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = [cv async for cv in page_obj.object_list]
+    return await sync_to_async(_render_dashboard)(request, page_obj, query)
+
+
+@alogin_required
+@acache_control(private=True, no_cache=True)
+@acondition(etag_func=_apreview_etag)
+async def acv_preview(request, cv_id):
+    try:
+        cv = await CV.objects.aget(id=cv_id, owner=request.user)
+    except CV.DoesNotExist:
+        raise Http404('No CV matches the given query.')
+    if request.method == 'POST':
+        response = await sync_to_async(_cv_preview_post)(request, cv)
+        if response is not None:
+            return response
+    return await sync_to_async(_render_preview)(request, cv)
@@ -0,0 +1,156 @@
+"""Per-process connection pool behind the ``cv_builder.db.postgresql`` backend.
+
+Django opens a connection on a request's first query and closes it when the
+request finishes. With the pooled backend, opening checks a connection out
+of this pool and closing puts it back, so a worker process holds at most
+``max_size`` physical connections however many threads or requests it
+serves.
+
+A connection idle for longer than ``check_after`` seconds is pinged before it
+is handed out, and one older than ``max_lifetime`` seconds is replaced. When
+every connection is checked out, callers wait up to ``timeout`` seconds and
+then get ``PoolTimeout``. Wait times are counted in ``stats()`` and reported
+to the profiling middleware.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from cv_builder.profiling import record_pool_wait
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, max_size=4, timeout=10.0, check_after=30.0, max_lifetime=1800.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+        self._cond = threading.Condition()
+        # (connection, created, returned) tuples; the most recently returned is reused first
+        self._idle = deque()
+        self._created = {}
+        self._size = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.timeouts = 0
+        self.replaced = 0
+
+    def getconn(self, connect):
+        """Return an idle connection, or one made by calling ``connect()`` while below ``max_size``."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'no database connection free after {self.timeout:g}s ({self.max_size} in use)')
+                self._cond.wait(remaining)
+            if self._idle:
+                conn, created, returned = self._idle.pop()
+            else:
+                conn = None
+                self._size += 1
+            wait_ms = (time.monotonic() - start) * 1000
+            self.checkouts += 1
+            if wait_ms >= 1:
+                self.waits += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+        record_pool_wait(wait_ms)
+
+        if conn is not None:
+            now = time.monotonic()
+            if now - created > self.max_lifetime or (now - returned > self.check_after and not _ping(conn)):
+                _close(conn)
+                conn = None
+                with self._cond:
+                    self.replaced += 1
+        if conn is None:
+            try:
+                conn = connect()
+            except BaseException:
+                self._release_slot()
+                raise
+            created = time.monotonic()
+        with self._cond:
+            self._created[id(conn)] = created
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return ``conn`` to the pool, or close it for good when ``close`` is true or it is broken."""
+        with self._cond:
+            created = self._created.pop(id(conn), None)
+        if created is None:
+            return
+        if close or getattr(conn, 'closed', False):
+            _close(conn)
+            self._release_slot()
+            return
+        with self._cond:
+            self._idle.append((conn, created, time.monotonic()))
+            self._cond.notify()
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_ms_mean': self.wait_ms_total / self.checkouts if self.checkouts else 0.0,
+                'wait_ms_max': self.wait_ms_max,
+                'timeouts': self.timeouts,
+                'replaced': self.replaced,
+            }
+
+
+def _ping(conn):
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        finally:
+            cursor.close()
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, **options):
+    """The pool for ``key`` in this process, created with ``options`` on first use."""
+    # Keyed by pid so a forked worker starts its own pool. The parent's pools
+    # stay referenced: closing their inherited sockets would end its sessions.
+    key = (os.getpid(), key)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**options)
+        return pool
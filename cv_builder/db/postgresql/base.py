@@ -0,0 +1,48 @@
+"""PostgreSQL backend that takes its connections from a per-process pool.
+
+Configured like Django 5.1's pooled backend, with the pool options under
+``OPTIONS['pool']`` (see ``cv_builder.db.pool.ConnectionPool``). Use it with
+``CONN_MAX_AGE = 0`` so every request returns its connection.
+"""
+from django.db.backends.postgresql import base
+
+from cv_builder.db.pool import PoolTimeout, get_pool
+
+if base.is_psycopg3:
+    TRANSACTION_IDLE = base.Database.pq.TransactionStatus.IDLE
+else:
+    TRANSACTION_IDLE = base.Database.extensions.TRANSACTION_STATUS_IDLE
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        params = self.get_connection_params()
+        # One pool per distinct target, so the test database never gets connections to the real one
+        key = (self.alias, tuple(sorted((k, str(v)) for k, v in params.items())))
+        return get_pool(key, **self.settings_dict['OPTIONS'].get('pool', {}))
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.pool.getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        # Closed inside atomic(), the wrapper keeps its reference, so the
+        # connection must not go back to the pool; neither may a broken one
+        discard = self.in_atomic_block or connection.closed
+        if not discard and connection.info.transaction_status != TRANSACTION_IDLE:
+            try:
+                connection.rollback()
+            except self.Database.Error:
+                discard = True
+        self.pool.putconn(connection, close=discard)
@@ -0,0 +1,25 @@
+"""SQLite backend tuned for concurrent requests against ``db.sqlite3``.
+
+* WAL journal: readers no longer block the writer or each other.
+* ``synchronous = NORMAL``: safe with WAL, and commits skip an fsync.
+* Transactions start with ``BEGIN IMMEDIATE``. A deferred transaction that
+  reads and then writes fails at once with "database is locked" when another
+  connection wrote in between, whatever the busy timeout. Taking the write
+  lock up front makes it wait for the timeout instead (Django 5.1's
+  ``transaction_mode``).
+
+The busy timeout itself is ``OPTIONS['timeout']``, in seconds.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if not self.is_in_memory_db():
+            conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
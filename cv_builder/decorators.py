@@ -0,0 +1,54 @@
+"""Async counterparts of the view decorators the sync views use.
+
+Django 4.2's ``login_required``, ``cache_control`` and ``condition`` only
+wrap sync views, and ``request.user`` and the session load synchronously.
+``alogin_required`` resolves both on a worker thread once, so the rest of an
+async view can read them from the event loop.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+
+def _is_authenticated(request):
+    return request.user.is_authenticated
+
+
+def alogin_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not await sync_to_async(_is_authenticated)(request):
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def acache_control(**kwargs):
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **view_kwargs):
+            response = await view(request, *args, **view_kwargs)
+            patch_cache_control(response, **kwargs)
+            return response
+        return wrapper
+    return decorator
+
+
+def acondition(etag_func):
+    """Like ``condition(etag_func=...)``, with ``etag_func`` a coroutine function."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if etag and request.method in ('GET', 'HEAD'):
+                response.headers.setdefault('ETag', etag)
+            return response
+        return wrapper
+    return decorator
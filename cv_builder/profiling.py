@@ -0,0 +1,240 @@
+"""Opt-in request profiling, enabled with the ``CV_PROFILING`` environment variable.
+
+``ProfilingMiddleware`` times SQL, template rendering, waits for a pooled
+database connection and the whole view for each request and reports them in
+a ``Server-Timing`` header. A sample of requests runs under cProfile and the
+dump is kept when the request was slow.
+Per-URL-name timings are aggregated in memory and periodically written to
+``RequestTimingSummary`` rows, which are browsable in the admin. Each row
+covers one process (``pid``) over one flush period; with several workers a
+URL gets one row per worker per period, not a combined figure.
+
+The middleware handles sync and async requests natively. cProfile sampling
+only applies to sync requests: a profiler enabled across ``await`` points
+would also record whatever else the event loop ran meanwhile.
+"""
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('cv_profiling_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_ms', 'template_ms', 'template_depth', 'pool_wait_ms')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.pool_wait_ms = 0.0
+
+
+def _timed_execute(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_ms += (time.perf_counter() - start) * 1000
+
+
+def install_sql_timer(connection):
+    """Time the queries ``connection`` runs for whichever request is being profiled.
+
+    Connections are per thread, and async views query from sync_to_async
+    threads, so the timer stays installed and finds the request's stats
+    through the context variable, which those threads inherit.
+    """
+    if _timed_execute not in connection.execute_wrappers:
+        # First, so execute_wrapper() blocks opened earlier still pop their own entry
+        connection.execute_wrappers.insert(0, _timed_execute)
+
+
+def _connection_created(sender, connection, **kwargs):
+    install_sql_timer(connection)
+
+
+def record_pool_wait(wait_ms):
+    """Called by cv_builder.db.pool with the time a connection checkout waited."""
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_ms += wait_ms
+
+
+class ProfilingTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # Only the outermost render counts; nested renders are already inside it
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if stats.template_depth == 0:
+                stats.template_ms += (time.perf_counter() - start) * 1000
+
+
+class ProfilingTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report render time to the middleware."""
+
+    def from_string(self, template_code):
+        return ProfilingTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return ProfilingTemplate(template.template, self)
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class TimingAggregator:
+    """Keeps recent samples per URL name and flushes percentile summaries to the database."""
+
+    def __init__(self, window, flush_seconds):
+        self.window = window
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._last_flush = time.monotonic()
+
+    def record(self, url_name, total_ms, stats):
+        """Add a sample; returns the samples due for ``flush()``, or None."""
+        with self._lock:
+            self._samples[url_name].append(
+                (total_ms, stats.db_ms, stats.queries, stats.template_ms, stats.pool_wait_ms))
+            if time.monotonic() - self._last_flush < self.flush_seconds:
+                return None
+            samples, self._samples = self._samples, defaultdict(lambda: deque(maxlen=self.window))
+            self._last_flush = time.monotonic()
+        return samples
+
+    def flush(self, samples):
+        from cv_app.models import RequestTimingSummary
+
+        now = timezone.now()
+        rows = []
+        for url_name, entries in samples.items():
+            totals = sorted(e[0] for e in entries)
+            count = len(entries)
+            rows.append(RequestTimingSummary(
+                url_name=url_name,
+                period_end=now,
+                pid=os.getpid(),
+                count=count,
+                p50_ms=_percentile(totals, 50),
+                p95_ms=_percentile(totals, 95),
+                p99_ms=_percentile(totals, 99),
+                max_ms=totals[-1],
+                mean_db_ms=sum(e[1] for e in entries) / count,
+                mean_queries=sum(e[2] for e in entries) / count,
+                mean_template_ms=sum(e[3] for e in entries) / count,
+                mean_pool_wait_ms=sum(e[4] for e in entries) / count,
+            ))
+        try:
+            RequestTimingSummary.objects.bulk_create(rows)
+        except Exception:
+            logger.exception('Could not store request timing summaries')
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.CV_PROFILING_SAMPLE_RATE
+        self.slow_ms = settings.CV_PROFILING_SLOW_MS
+        self.dump_dir = Path(settings.CV_PROFILING_DIR)
+        self.aggregator = TimingAggregator(settings.CV_PROFILING_WINDOW, settings.CV_PROFILING_FLUSH_SECONDS)
+        connection_created.connect(_connection_created, dispatch_uid='cv_profiling_sql_timer')
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before the middleware loaded never sent connection_created
+        install_sql_timer(connection)
+        stats = RequestStats()
+        token = _current.set(stats)
+        profiler = cProfile.Profile() if random.random() < self.sample_rate else None
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        url_name = self._finish(request, response, stats, total_ms)
+        if profiler is not None and total_ms >= self.slow_ms:
+            self._dump(profiler, url_name, total_ms)
+        samples = self.aggregator.record(url_name, total_ms, stats)
+        if samples:
+            self.aggregator.flush(samples)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        url_name = self._finish(request, response, stats, total_ms)
+        samples = self.aggregator.record(url_name, total_ms, stats)
+        if samples:
+            await sync_to_async(self.aggregator.flush)(samples)
+        return response
+
+    def _finish(self, request, response, stats, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={stats.db_ms:.1f};desc="{stats.queries} queries"',
+            f'tpl;dur={stats.template_ms:.1f}',
+            f'dbpool;dur={stats.pool_wait_ms:.1f};desc="connection wait"',
+            f'total;dur={total_ms:.1f}',
+        ])
+        return (match.view_name if match else None) or 'unresolved'
+
+    def _dump(self, profiler, url_name, total_ms):
+        try:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+            safe_name = url_name.replace(':', '-')
+            path = self.dump_dir / f'{safe_name}-{int(time.time() * 1000)}-{int(total_ms)}ms.prof'
+            profiler.dump_stats(path)
+        except OSError:
+            logger.exception('Could not write profile dump')
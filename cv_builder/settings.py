@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Public CV snapshots, served before sessions and auth load
+    'cv_app.sharing.SharedSnapshotMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,6 +60,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in request profiling (Server-Timing headers, cProfile dumps, admin summaries)
+CV_PROFILING = os.environ.get('CV_PROFILING', 'False') == 'True'
+CV_PROFILING_SAMPLE_RATE = float(os.environ.get('CV_PROFILING_SAMPLE_RATE', 0.01))
+CV_PROFILING_SLOW_MS = float(os.environ.get('CV_PROFILING_SLOW_MS', 500))
+CV_PROFILING_DIR = Path(os.environ.get('CV_PROFILING_DIR', BASE_DIR / 'tmp' / 'profiles'))
+CV_PROFILING_WINDOW = int(os.environ.get('CV_PROFILING_WINDOW', 1000))
+CV_PROFILING_FLUSH_SECONDS = int(os.environ.get('CV_PROFILING_FLUSH_SECONDS', 60))
+if CV_PROFILING:
+    MIDDLEWARE.insert(0, 'cv_builder.profiling.ProfilingMiddleware')
+
 ROOT_URLCONF = 'cv_builder.urls'
 
 TEMPLATES = [
@@ -75,22 +87,99 @@ TEMPLATES = [
         },
     },
 ]
+if CV_PROFILING:
+    TEMPLATES[0]['BACKEND'] = 'cv_builder.profiling.ProfilingTemplates'
 
 WSGI_APPLICATION = 'cv_builder.wsgi.application'
 
+# Route dashboard, preview and profile to their async views. Serve
+# cv_builder.asgi with uvicorn workers when enabled (see README).
+CV_ASYNC_VIEWS = os.environ.get('CV_ASYNC_VIEWS', 'False') == 'True'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# The default SQLite file uses WAL, synchronous=NORMAL and IMMEDIATE write
+# transactions, and waits CV_SQLITE_BUSY_TIMEOUT seconds for the write lock
+# (see cv_builder.db.sqlite3). Set CV_SQLITE_TUNED=False for stock settings.
+CV_SQLITE_TUNED = os.environ.get('CV_SQLITE_TUNED', 'True') == 'True'
+CV_SQLITE_BUSY_TIMEOUT = float(os.environ.get('CV_SQLITE_BUSY_TIMEOUT', 10))
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'cv_builder.db.sqlite3' if CV_SQLITE_TUNED else 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'timeout': CV_SQLITE_BUSY_TIMEOUT},
     }
 }
+
+# How DATABASE_URL (Postgres) connections are managed:
+#   persistent - one per worker thread, kept 600s, health-checked before reuse
+#   pool       - a pool of CV_DB_POOL_SIZE per worker process (cv_builder.db.pool);
+#                checkouts wait up to CV_DB_POOL_TIMEOUT seconds
+#   pgbouncer  - behind a PgBouncer in transaction pooling mode
+CV_DB_CONNECTIONS = os.environ.get('CV_DB_CONNECTIONS', 'persistent')
+CV_DB_POOL_SIZE = int(os.environ.get('CV_DB_POOL_SIZE', 4))
+CV_DB_POOL_TIMEOUT = float(os.environ.get('CV_DB_POOL_TIMEOUT', 10))
+# Ping pooled connections idle longer than this; replace them after MAX_LIFETIME
+CV_DB_POOL_CHECK_AFTER = float(os.environ.get('CV_DB_POOL_CHECK_AFTER', 30))
+CV_DB_POOL_MAX_LIFETIME = float(os.environ.get('CV_DB_POOL_MAX_LIFETIME', 1800))
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if DATABASE_URL:
-    DATABASES['default'] = dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
+    # Persistent connections are per thread, and under ASGI each request runs
+    # its ORM calls on a thread of its own, so they would pile up unclosed
+    persistent = CV_DB_CONNECTIONS != 'pool' and not CV_ASYNC_VIEWS
+    DATABASES['default'] = dj_database_url.parse(
+        DATABASE_URL, conn_max_age=600 if persistent else 0, conn_health_checks=True, ssl_require=True)
+    if CV_DB_CONNECTIONS == 'pool':
+        DATABASES['default']['ENGINE'] = 'cv_builder.db.postgresql'
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'max_size': CV_DB_POOL_SIZE,
+            'timeout': CV_DB_POOL_TIMEOUT,
+            'check_after': CV_DB_POOL_CHECK_AFTER,
+            'max_lifetime': CV_DB_POOL_MAX_LIFETIME,
+        }
+    elif CV_DB_CONNECTIONS == 'pgbouncer':
+        # Transaction pooling can hand each transaction a different server
+        # connection, so named cursors cannot outlive one
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cv-builder',
+    }
+}
+
+# Sessions: 'db' (default), 'cache' (cached, written through to the database,
+# which serves cache misses) or 'cookie' (signed cookies, nothing stored).
+# Changing the mode signs everyone out once.
+CV_SESSION_MODE = os.environ.get('CV_SESSION_MODE', 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cached_db',
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+}[CV_SESSION_MODE]
+
+# Seconds the logged-in user is cached between requests (0 disables it). Saving
+# a user drops the entry in that process; other processes see the change once
+# their entry expires. Enabling or disabling it signs everyone out once.
+CV_USER_CACHE_TTL = int(os.environ.get('CV_USER_CACHE_TTL', 0))
+if CV_USER_CACHE_TTL:
+    AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+
+# Seconds a rendered CV preview body is kept; entries are also dropped on save/delete
+CV_PREVIEW_CACHE_TIMEOUT = int(os.environ.get('CV_PREVIEW_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# CV revision history writes a full snapshot after this many deltas
+CV_REVISION_SNAPSHOT_EVERY = int(os.environ.get('CV_REVISION_SNAPSHOT_EVERY', 20))
+
+# Seconds before each process re-reads CVTemplate; local saves/deletes reload immediately
+CV_TEMPLATE_REGISTRY_TTL = int(os.environ.get('CV_TEMPLATE_REGISTRY_TTL', 300))
 
 
 # Password validation
@@ -129,6 +218,14 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# Output of `manage.py build_assets`; collected alongside static/ once it exists
+CV_ASSET_BUILD_DIR = Path(os.environ.get('CV_ASSET_BUILD_DIR', BASE_DIR / 'static_build'))
+if CV_ASSET_BUILD_DIR.is_dir():
+    STATICFILES_DIRS.append(CV_ASSET_BUILD_DIR)
+
+# Preview pages inline their CSS bundle up to this size instead of linking it
+CV_INLINE_CSS_MAX_BYTES = int(os.environ.get('CV_INLINE_CSS_MAX_BYTES', 14 * 1024))
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -136,6 +233,11 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploaded photos are downsized to this many pixels on the long edge; thumbnails
+# are sized for the 96px avatar at 2x density
+CV_PHOTO_MAX_SIZE = int(os.environ.get('CV_PHOTO_MAX_SIZE', 800))
+CV_PHOTO_THUMB_SIZE = int(os.environ.get('CV_PHOTO_THUMB_SIZE', 192))
+
 # Security & HTTPS (Render terminates TLS and forwards headers)
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = not DEBUG
@@ -151,6 +253,19 @@ LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
 LOGIN_URL = '/accounts/login/'
 
+# Published CVs: self-contained HTML snapshots written to CV_SHARE_ROOT and
+# served at CV_SHARE_URL<token>.html, cached by browsers for CV_SHARE_MAX_AGE
+CV_SHARE_ROOT = Path(os.environ.get('CV_SHARE_ROOT', BASE_DIR / 'shared'))
+CV_SHARE_URL = '/s/'
+CV_SHARE_MAX_AGE = int(os.environ.get('CV_SHARE_MAX_AGE', 60 * 60))
+
+# Server-side PDF export: rendered files are kept on disk per CV version
+CV_PDF_ROOT = Path(os.environ.get('CV_PDF_ROOT', BASE_DIR / 'tmp' / 'pdf'))
+CV_PDF_WORKERS = int(os.environ.get('CV_PDF_WORKERS', 2))
+CV_PDF_MAX_PENDING = int(os.environ.get('CV_PDF_MAX_PENDING', 32))
+# Seconds after which another process may take over an unfinished render
+CV_PDF_RENDER_TIMEOUT = int(os.environ.get('CV_PDF_RENDER_TIMEOUT', 120))
+
 # Email backend (development - file-based)
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'tmp' / 'emails'